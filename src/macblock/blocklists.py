@@ -17,7 +17,7 @@ from macblock.constants import (
     VAR_DB_DNSMASQ_PID,
     BLOCKLIST_SOURCES,
 )
-from macblock.launchd import kickstart, service_exists
+from macblock.launchd import kickstart, service_loaded
 from macblock.errors import MacblockError
 from macblock.exec import run
 from macblock.fs import atomic_write_text
@@ -176,7 +176,7 @@ def _download(url: str, *, expected_sha256: str | None = None) -> str:
 
 def reload_dnsmasq() -> None:
     label = f"{APP_LABEL}.dnsmasq"
-    if service_exists(label):
+    if service_loaded(label):
         try:
             kickstart(label)
         except Exception as e:
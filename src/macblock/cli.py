@@ -7,12 +7,6 @@ import sys
 
 from macblock import __version__
 from macblock.errors import MacblockError, PrivilegeError, UnsupportedPlatformError
-from macblock.install import do_install, do_uninstall
-from macblock.blocklists import (
-    list_blocklist_sources,
-    set_blocklist_source,
-    update_blocklist,
-)
 from macblock.control import (
     do_disable,
     do_enable,
@@ -25,14 +19,6 @@ from macblock.control import (
 from macblock.doctor import run_diagnostics
 from macblock.dns_test import test_domain
 from macblock.help import show_main_help, show_command_help
-from macblock.lists import (
-    add_blacklist,
-    add_whitelist,
-    list_blacklist,
-    list_whitelist,
-    remove_blacklist,
-    remove_whitelist,
-)
 from macblock.platform import is_root, require_macos
 from macblock.status import show_status
 
@@ -316,10 +302,14 @@ def main(argv: list[str] | None = None) -> int:
                 stream=str(args.get("stream", "auto")),
             )
         if cmd == "install":
+            from macblock.install import do_install
+
             return do_install(
                 force=bool(args.get("force")), skip_update=bool(args.get("skip_update"))
             )
         if cmd == "uninstall":
+            from macblock.install import do_uninstall
+
             return do_uninstall(force=bool(args.get("force")))
         if cmd == "enable":
             return do_enable()
@@ -332,20 +322,28 @@ def main(argv: list[str] | None = None) -> int:
         if cmd == "test":
             return test_domain(args["domain"])
         if cmd == "update":
+            from macblock.blocklists import update_blocklist
+
             return update_blocklist(
                 source=args.get("source"), sha256=args.get("sha256")
             )
         if cmd == "sources":
+            from macblock.blocklists import list_blocklist_sources, set_blocklist_source
+
             if args.get("sources_cmd") == "list":
                 return list_blocklist_sources()
             return set_blocklist_source(args["source"])
         if cmd == "allow":
+            from macblock.lists import add_whitelist, list_whitelist, remove_whitelist
+
             if args.get("allow_cmd") == "add":
                 return add_whitelist(args["domain"])
             if args.get("allow_cmd") == "remove":
                 return remove_whitelist(args["domain"])
             return list_whitelist()
         if cmd == "deny":
+            from macblock.lists import add_blacklist, list_blacklist, remove_blacklist
+
             if args.get("deny_cmd") == "add":
                 return add_blacklist(args["domain"])
             if args.get("deny_cmd") == "remove":
@@ -18,12 +18,13 @@ from macblock.errors import MacblockError
 from macblock.fs import atomic_write_text
 from macblock.launchd import kickstart
 from macblock.state import load_state, replace_state, save_state_atomic
+from macblock.process import process_running
 from macblock.resolvers import (
     parse_fallback_upstreams,
     read_fallback_upstreams,
     render_fallback_upstreams,
 )
-from macblock.system_dns import compute_managed_services, get_dns_servers
+from macblock.system_dns import compute_managed_services, get_dns_servers_many
 from macblock.ui import (
     Spinner,
     header,
@@ -56,26 +57,16 @@ def _check_installed() -> None:
         raise MacblockError("macblock is not installed; run: sudo macblock install")
 
 
-def _is_process_running(pid: int) -> bool:
-    if pid <= 1:
-        return False
-    try:
-        os.kill(pid, 0)
-        return True
-    except ProcessLookupError:
-        return False
-    except PermissionError:
-        return True
-
-
 def _read_daemon_pid() -> int | None:
-    if not VAR_DB_DAEMON_PID.exists():
+    try:
+        raw = VAR_DB_DAEMON_PID.read_bytes()
+    except OSError:
         return None
     try:
-        pid = int(VAR_DB_DAEMON_PID.read_text(encoding="utf-8").strip())
-        return pid if pid > 1 else None
-    except Exception:
+        pid = int(raw.strip())
+    except ValueError:
         return None
+    return pid if pid > 1 else None
 
 
 def _signal_daemon() -> bool:
@@ -83,7 +74,7 @@ def _signal_daemon() -> bool:
     if pid is None:
         return False
 
-    if not _is_process_running(pid):
+    if not process_running(pid):
         return False
 
     try:
@@ -112,7 +103,7 @@ def _wait_for_daemon_ready(timeout: float = DEFAULT_TIMEOUT) -> bool:
     while time.time() < deadline:
         if VAR_DB_DAEMON_READY.exists():
             pid = _read_daemon_pid()
-            if pid and _is_process_running(pid):
+            if pid and process_running(pid):
                 return True
         time.sleep(RETRY_DELAY)
     return False
@@ -123,15 +114,16 @@ def _wait_for_dns_localhost(timeout: float = DEFAULT_TIMEOUT) -> tuple[bool, lis
     if not managed:
         return True, []
 
+    names = [info.name for info in managed]
     deadline = time.time() + timeout
     failed_services: list[str] = []
 
     while time.time() < deadline:
         failed_services = []
-        for info in managed:
-            dns = get_dns_servers(info.name)
-            if dns != ["127.0.0.1"]:
-                failed_services.append(info.name)
+        servers_by_svc = get_dns_servers_many(names, fresh=True)
+        for name in names:
+            if servers_by_svc[name] != ["127.0.0.1"]:
+                failed_services.append(name)
 
         if not failed_services:
             return True, []
@@ -146,15 +138,16 @@ def _wait_for_dns_restored(timeout: float = DEFAULT_TIMEOUT) -> tuple[bool, list
     if not managed:
         return True, []
 
+    names = [info.name for info in managed]
     deadline = time.time() + timeout
     still_localhost: list[str] = []
 
     while time.time() < deadline:
         still_localhost = []
-        for info in managed:
-            dns = get_dns_servers(info.name)
-            if dns == ["127.0.0.1"]:
-                still_localhost.append(info.name)
+        servers_by_svc = get_dns_servers_many(names, fresh=True)
+        for name in names:
+            if servers_by_svc[name] == ["127.0.0.1"]:
+                still_localhost.append(name)
 
         if not still_localhost:
             return True, []
@@ -28,13 +28,21 @@ from macblock.constants import (
 from macblock.errors import MacblockError
 from macblock.exec import run
 from macblock.fs import atomic_write_text
+from macblock.process import process_running
 from macblock.resolvers import (
     Resolvers,
     ensure_fallback_upstreams_file,
     read_system_resolvers,
 )
-from macblock.state import State, load_state, replace_state, save_state_atomic
+from macblock.state import (
+    State,
+    load_state,
+    replace_state,
+    save_state_atomic,
+    state_file_matches,
+)
 from macblock.system_dns import (
+    clear_query_cache,
     compute_managed_services,
     get_dns_servers,
     get_search_domains,
@@ -76,26 +84,16 @@ def _is_forward_ip(ip: str) -> bool:
     return True
 
 
-def _is_process_running(pid: int) -> bool:
-    if pid <= 1:
-        return False
-    try:
-        os.kill(pid, 0)
-        return True
-    except ProcessLookupError:
-        return False
-    except PermissionError:
-        return True
-
-
 def _read_pid_file(path) -> int | None:
-    if not path.exists():
+    try:
+        raw = path.read_bytes()
+    except OSError:
         return None
     try:
-        pid = int(path.read_text(encoding="utf-8").strip())
-        return pid if pid > 1 else None
-    except Exception:
+        pid = int(raw.strip())
+    except ValueError:
         return None
+    return pid if pid > 1 else None
 
 
 _IPV4_RE = re.compile(r"^(?:\d{1,3}\.){3}\d{1,3}$")
@@ -219,7 +217,7 @@ def _hup_dnsmasq() -> bool:
     if pid is None:
         return False
 
-    if not _is_process_running(pid):
+    if not process_running(pid):
         print(
             f"dnsmasq pid {pid} not running, removing stale pid file", file=sys.stderr
         )
@@ -486,8 +484,10 @@ def _verify_dns_state(
 
 def _apply_state(*, reason: str = "unknown") -> tuple[bool, list[str]]:
     started = time.time()
+    clear_query_cache()
 
     state = load_state(SYSTEM_STATE_FILE)
+    loaded_state = state
     issues: list[str] = []
 
     now = int(time.time())
@@ -521,7 +521,11 @@ def _apply_state(*, reason: str = "unknown") -> tuple[bool, list[str]]:
         issues.extend(failures)
         should_be_localhost = False
 
-    save_state_atomic(SYSTEM_STATE_FILE, state)
+    # Most applies (wake, network change) leave the state as it was; only
+    # rewrite state.json when something changed or the file is missing or in
+    # an older format.
+    if state != loaded_state or not state_file_matches(SYSTEM_STATE_FILE, state):
+        save_state_atomic(SYSTEM_STATE_FILE, state)
 
     upstreams_changed = _update_upstreams(state)
     if upstreams_changed:
@@ -666,7 +670,7 @@ def _check_stale_daemon() -> bool:
     if pid == os.getpid():
         return False
 
-    if _is_process_running(pid):
+    if process_running(pid):
         print(f"another daemon is already running (pid={pid})", file=sys.stderr)
         return True
 
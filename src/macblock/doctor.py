@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import json
-import os
 import socket
 import time
 
@@ -28,9 +27,11 @@ from macblock.constants import (
 )
 from macblock.errors import MacblockError
 from macblock.exec import run
-from macblock.resolvers import parse_upstream_conf, read_fallback_upstreams
+from macblock.fs import count_lines, existing_paths
+from macblock.process import process_running
+from macblock.resolvers import read_fallback_upstreams, read_upstream_conf
 from macblock.state import load_state
-from macblock.system_dns import get_dns_servers
+from macblock.system_dns import get_dns_servers_many
 from macblock.ui import (
     cyan,
     dim,
@@ -96,26 +97,16 @@ def _check_version() -> tuple[bool, str | None]:
     return True, installed
 
 
-def _is_process_running(pid: int) -> bool:
-    if pid <= 1:
-        return False
-    try:
-        os.kill(pid, 0)
-        return True
-    except ProcessLookupError:
-        return False
-    except PermissionError:
-        return True
-
-
 def _read_pid_file(path) -> int | None:
-    if not path.exists():
+    try:
+        raw = path.read_bytes()
+    except OSError:
         return None
     try:
-        pid = int(path.read_text(encoding="utf-8").strip())
-        return pid if pid > 1 else None
-    except Exception:
+        pid = int(raw.strip())
+    except ValueError:
         return None
+    return pid if pid > 1 else None
 
 
 def _check_port_in_use(host: str, port: int) -> str | None:
@@ -165,8 +156,16 @@ def run_diagnostics() -> int:
         ("upstream.conf", VAR_DB_UPSTREAM_CONF),
     ]
 
+    plist_checks = [
+        ("dnsmasq", LAUNCHD_DNSMASQ_PLIST),
+        ("daemon", daemon_plist),
+    ]
+    present = set(
+        existing_paths([p for _, p in config_files] + [p for _, p in plist_checks])
+    )
+
     for name, path in config_files:
-        if path.exists():
+        if path in present:
             list_item_ok(f"{name}")
         else:
             list_item_fail(f"{name} {dim('(missing)')}")
@@ -174,14 +173,9 @@ def run_diagnostics() -> int:
 
     # Launchd services
     subheader("Launchd Services")
-    plist_checks = [
-        ("dnsmasq", LAUNCHD_DNSMASQ_PLIST),
-        ("daemon", daemon_plist),
-    ]
-
     for name, plist in plist_checks:
         label = f"{APP_LABEL}.{name}"
-        if plist.exists():
+        if plist in present:
             list_item_ok(label)
         else:
             list_item_fail(f"{label} {dim('(not installed)')}")
@@ -192,7 +186,7 @@ def run_diagnostics() -> int:
     if SYSTEM_BLOCKLIST_FILE.exists():
         try:
             size = SYSTEM_BLOCKLIST_FILE.stat().st_size
-            line_count = len(SYSTEM_BLOCKLIST_FILE.read_text().splitlines())
+            line_count = count_lines(SYSTEM_BLOCKLIST_FILE)
         except Exception:
             size = 0
             line_count = 0
@@ -215,10 +209,7 @@ def run_diagnostics() -> int:
     upstream_conf = None
     if VAR_DB_UPSTREAM_CONF.exists():
         try:
-            upstream_text = VAR_DB_UPSTREAM_CONF.read_text(
-                encoding="utf-8", errors="replace"
-            )
-            upstream_conf = parse_upstream_conf(upstream_text)
+            upstream_conf = read_upstream_conf(VAR_DB_UPSTREAM_CONF)
         except Exception:
             upstream_conf = None
 
@@ -303,7 +294,7 @@ def run_diagnostics() -> int:
     if dnsmasq_pid is None:
         status_warn("PID file", "missing")
         issues.append("dnsmasq PID file missing")
-    elif not _is_process_running(dnsmasq_pid):
+    elif not process_running(dnsmasq_pid):
         status_err("PID", f"{dnsmasq_pid} (not running)")
         issues.append(f"dnsmasq process {dnsmasq_pid} not running")
         suggestions.append(
@@ -335,7 +326,7 @@ def run_diagnostics() -> int:
     if daemon_pid is None:
         status_warn("PID file", "missing")
         issues.append("daemon PID file missing")
-    elif not _is_process_running(daemon_pid):
+    elif not process_running(daemon_pid):
         status_err("PID", f"{daemon_pid} (not running)")
         issues.append(f"daemon process {daemon_pid} not running")
         suggestions.append(
@@ -348,7 +339,7 @@ def run_diagnostics() -> int:
         status_ok("Ready", "yes")
     else:
         status_warn("Ready", "no (not yet signaled)")
-        if daemon_pid and _is_process_running(daemon_pid):
+        if daemon_pid and process_running(daemon_pid):
             issues.append("daemon running but not ready")
 
     if VAR_DB_DAEMON_LAST_APPLY.exists():
@@ -392,8 +383,9 @@ def run_diagnostics() -> int:
         if st.managed_services:
             status_info("Managed", f"{len(st.managed_services)} services")
             dns_issues = []
+            servers_by_svc = get_dns_servers_many(st.managed_services)
             for svc in st.managed_services:
-                cur = get_dns_servers(svc)
+                cur = servers_by_svc[svc]
                 expected_localhost = st.enabled and not paused
                 if expected_localhost and cur != ["127.0.0.1"]:
                     dns_issues.append(f"{svc}: expected 127.0.0.1, got {cur}")
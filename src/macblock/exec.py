@@ -11,11 +11,18 @@ class RunResult:
     stderr: str
 
 
-def run(cmd: list[str], *, timeout: float | None = 10.0) -> RunResult:
+def run(
+    cmd: list[str], *, timeout: float | None = 10.0, input: str | None = None
+) -> RunResult:
     try:
+        # close_fds=False lets subprocess use posix_spawn instead of
+        # fork+exec. Descriptors opened by Python are non-inheritable
+        # (PEP 446), so nothing extra leaks into the child.
         p = subprocess.run(
             cmd,
+            input=input,
             check=False,
+            close_fds=False,
             text=True,
             encoding="utf-8",
             errors="replace",
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import functools
 import os
 import uuid
 from pathlib import Path
 
 
-def atomic_write_text(path: Path, text: str, mode: int | None = None) -> None:
+def atomic_write_bytes(path: Path, data: bytes, mode: int | None = None) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
     tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
 
     try:
-        tmp.write_text(text, encoding="utf-8")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            # Flush before the rename so a crash cannot leave an empty file
+            # under the final name.
+            os.fsync(fd)
+        finally:
+            os.close(fd)
         if mode is not None:
             os.chmod(tmp, mode)
         os.replace(tmp, path)
@@ -22,7 +32,62 @@ def atomic_write_text(path: Path, text: str, mode: int | None = None) -> None:
             pass
 
 
+def atomic_write_text(path: Path, text: str, mode: int | None = None) -> None:
+    atomic_write_bytes(path, text.encode("utf-8"), mode=mode)
+
+
 def ensure_dir(path: Path, mode: int | None = None) -> None:
-    path.mkdir(parents=True, exist_ok=True)
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        if not path.is_dir():
+            raise
+    except FileNotFoundError:
+        path.mkdir(parents=True, exist_ok=True)
     if mode is not None:
         os.chmod(path, mode)
+
+
+def existing_paths(paths: list[Path]) -> list[Path]:
+    """Return the entries of ``paths`` that exist, listing each parent dir once."""
+    listings: dict[Path, set[str] | None] = {}
+    found: list[Path] = []
+
+    for p in paths:
+        parent = p.parent
+        if parent not in listings:
+            try:
+                with os.scandir(parent) as it:
+                    listings[parent] = {e.name for e in it}
+            except FileNotFoundError:
+                listings[parent] = set()
+            except OSError:
+                # Unlistable (e.g. permissions): fall back to per-path stat.
+                listings[parent] = None
+
+        names = listings[parent]
+        if p.exists() if names is None else p.name in names:
+            found.append(p)
+
+    return found
+
+
+def count_lines(path: Path) -> int:
+    """Count lines (including an unterminated last one) without decoding.
+
+    Results are cached per (inode, mtime, size), so repeated calls on an
+    unchanged file do not re-read it.
+    """
+    st = os.stat(path)
+    return _count_lines_cached(path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _count_lines_cached(path: Path, _ino: int, _mtime_ns: int, _size: int) -> int:
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            count += chunk.count(b"\n")
+            last = chunk[-1:]
+    return count if last == b"\n" else count + 1
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import errno
 import os
+import plistlib
 import pwd
 import shutil
 import socket
 import sys
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from macblock import __version__
@@ -45,7 +48,11 @@ from macblock.constants import (
 from macblock.dnsmasq import render_dnsmasq_conf
 from macblock.errors import MacblockError
 from macblock.exec import run
-from macblock.fs import atomic_write_text, ensure_dir
+from macblock.fs import (
+    atomic_write_bytes,
+    ensure_dir,
+    existing_paths,
+)
 from macblock.resolvers import render_fallback_upstreams
 from macblock.launchd import (
     bootout_label,
@@ -53,8 +60,9 @@ from macblock.launchd import (
     bootstrap_system,
     enable_service,
     kickstart,
-    service_exists,
+    service_loaded,
 )
+from macblock.process import process_running
 from macblock.state import State, load_state, save_state_atomic
 from macblock.system_dns import ServiceDnsBackup, restore_from_backup
 from macblock.ui import (
@@ -78,6 +86,35 @@ def _chown_user(path: Path, user: str) -> None:
     os.chown(path, pw.pw_uid, pw.pw_gid)
 
 
+def _create_if_absent(path: Path, content: str = "", mode: int = 0o644) -> bool:
+    if path.exists():
+        return False
+
+    # Seed a temp file and link it into place: a crash never leaves a short
+    # file under the final name, and an existing file is never replaced.
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        try:
+            os.fchmod(fd, mode)
+            view = memoryview(content.encode("utf-8"))
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            return False
+    finally:
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+    return True
+
+
 def _check_port_available(host: str, port: int) -> tuple[bool, str | None]:
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -109,7 +146,7 @@ def _check_dnsmasq_installed() -> tuple[bool, str | None]:
         "/usr/local/sbin/dnsmasq",
     ]
     for c in candidates:
-        if c and Path(c).exists():
+        if c and os.path.isfile(c):
             return True, c
     return False, None
 
@@ -122,77 +159,61 @@ def _find_dnsmasq_bin() -> str:
 
 
 def _find_macblock_bin() -> str:
+    exe = sys.executable
     candidates = [
         os.environ.get("MACBLOCK_BIN", ""),
         "/opt/homebrew/bin/macblock",
         "/usr/local/bin/macblock",
-        shutil.which("macblock"),
+        # After the stable prefixes: on Homebrew the interpreter lives in a
+        # versioned Cellar path that brew upgrade/cleanup deletes.
+        str(Path(exe).parent / "macblock") if exe else "",
     ]
     for c in candidates:
-        if c and Path(c).exists():
+        if c and os.path.isfile(c):
             return c
 
-    exe = sys.executable
-    if exe:
-        venv_bin = Path(exe).parent / "macblock"
-        if venv_bin.exists():
-            return str(venv_bin)
+    # Scanning every PATH entry is the slowest probe; only do it as a last resort.
+    found = shutil.which("macblock")
+    if found and os.path.isfile(found):
+        return found
 
     raise MacblockError("macblock binary not found in PATH")
 
 
-def _render_dnsmasq_plist(dnsmasq_bin: str) -> str:
-    return f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-  <key>Label</key>
-  <string>{APP_LABEL}.dnsmasq</string>
-  <key>ProgramArguments</key>
-  <array>
-    <string>{dnsmasq_bin}</string>
-    <string>--keep-in-foreground</string>
-    <string>-C</string>
-    <string>{SYSTEM_DNSMASQ_CONF}</string>
-  </array>
-  <key>StandardOutPath</key>
-  <string>{SYSTEM_LOG_DIR}/dnsmasq.out.log</string>
-  <key>StandardErrorPath</key>
-  <string>{SYSTEM_LOG_DIR}/dnsmasq.err.log</string>
-  <key>RunAtLoad</key>
-  <true/>
-  <key>KeepAlive</key>
-  <true/>
-</dict>
-</plist>
-"""
-
-
-def _render_daemon_plist(macblock_bin: str) -> str:
-    return f"""<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
-<plist version="1.0">
-<dict>
-  <key>Label</key>
-  <string>{APP_LABEL}.daemon</string>
-  <key>ProgramArguments</key>
-  <array>
-    <string>{macblock_bin}</string>
-    <string>daemon</string>
-  </array>
-  <key>StandardOutPath</key>
-  <string>{SYSTEM_LOG_DIR}/daemon.out.log</string>
-  <key>StandardErrorPath</key>
-  <string>{SYSTEM_LOG_DIR}/daemon.err.log</string>
-  <key>WorkingDirectory</key>
-  <string>/var/empty</string>
-  <key>RunAtLoad</key>
-  <true/>
-  <key>KeepAlive</key>
-  <true/>
-</dict>
-</plist>
-"""
+def _render_dnsmasq_plist(dnsmasq_bin: str) -> bytes:
+    return plistlib.dumps(
+        {
+            "Label": f"{APP_LABEL}.dnsmasq",
+            "ProgramArguments": [
+                dnsmasq_bin,
+                "--keep-in-foreground",
+                "-C",
+                str(SYSTEM_DNSMASQ_CONF),
+            ],
+            "StandardOutPath": f"{SYSTEM_LOG_DIR}/dnsmasq.out.log",
+            "StandardErrorPath": f"{SYSTEM_LOG_DIR}/dnsmasq.err.log",
+            "RunAtLoad": True,
+            "KeepAlive": True,
+        },
+        fmt=plistlib.FMT_BINARY,
+        sort_keys=False,
+    )
+
+
+def _render_daemon_plist(macblock_bin: str) -> bytes:
+    return plistlib.dumps(
+        {
+            "Label": f"{APP_LABEL}.daemon",
+            "ProgramArguments": [macblock_bin, "daemon"],
+            "StandardOutPath": f"{SYSTEM_LOG_DIR}/daemon.out.log",
+            "StandardErrorPath": f"{SYSTEM_LOG_DIR}/daemon.err.log",
+            "WorkingDirectory": "/var/empty",
+            "RunAtLoad": True,
+            "KeepAlive": True,
+        },
+        fmt=plistlib.FMT_BINARY,
+        sort_keys=False,
+    )
 
 
 def _bootstrap(plist: Path, label: str) -> None:
@@ -202,26 +223,23 @@ def _bootstrap(plist: Path, label: str) -> None:
 
 
 def _detect_existing_install() -> list[str]:
-    leftovers: list[str] = []
-
     old_pf_plist = LAUNCHD_DIR / f"{APP_LABEL}.pf.plist"
     old_bin_dir = SYSTEM_SUPPORT_DIR / "bin"
 
-    for p in [
-        SYSTEM_SUPPORT_DIR,
-        SYSTEM_DNSMASQ_CONF,
-        SYSTEM_STATE_FILE,
-        LAUNCHD_DNSMASQ_PLIST,
-        LAUNCHD_DAEMON_PLIST,
-        LAUNCHD_UPSTREAMS_PLIST,
-        LAUNCHD_STATE_PLIST,
-        old_pf_plist,
-        old_bin_dir,
-    ]:
-        if p.exists():
-            leftovers.append(str(p))
-
-    return leftovers
+    found = existing_paths(
+        [
+            SYSTEM_SUPPORT_DIR,
+            SYSTEM_DNSMASQ_CONF,
+            SYSTEM_STATE_FILE,
+            LAUNCHD_DNSMASQ_PLIST,
+            LAUNCHD_DAEMON_PLIST,
+            LAUNCHD_UPSTREAMS_PLIST,
+            LAUNCHD_STATE_PLIST,
+            old_pf_plist,
+            old_bin_dir,
+        ]
+    )
+    return [str(p) for p in found]
 
 
 def _cleanup_old_install() -> None:
@@ -252,18 +270,16 @@ def _cleanup_old_install() -> None:
         old_bin_dir / "update-upstreams.py",
         old_bin_dir / "macblockd.py",
     ]:
-        if p.exists():
-            try:
-                p.unlink()
-            except Exception:
-                pass
-
-    if old_bin_dir.exists():
         try:
-            old_bin_dir.rmdir()
-        except Exception:
+            p.unlink()
+        except OSError:
             pass
 
+    try:
+        old_bin_dir.rmdir()
+    except OSError:
+        pass
+
 
 def _run_preflight_checks(force: bool) -> tuple[str, str]:
     with Spinner("Running pre-flight checks") as spinner:
@@ -309,8 +325,8 @@ def _run_preflight_checks(force: bool) -> tuple[str, str]:
 
 
 def _wait_for_dnsmasq_ready(timeout: float = 5.0) -> bool:
-    deadline = time.time() + timeout
-    while time.time() < deadline:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             s.settimeout(0.5)
@@ -324,21 +340,40 @@ def _wait_for_dnsmasq_ready(timeout: float = 5.0) -> bool:
 
 
 def _wait_for_daemon_ready(timeout: float = 5.0) -> bool:
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        if VAR_DB_DAEMON_PID.exists():
-            try:
-                pid = int(VAR_DB_DAEMON_PID.read_text(encoding="utf-8").strip())
-                if pid > 1:
-                    r = run(["/bin/ps", "-p", str(pid)])
-                    if r.returncode == 0:
-                        return True
-            except Exception:
-                pass
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            pid = int(VAR_DB_DAEMON_PID.read_bytes().strip())
+        except (OSError, ValueError):
+            pid = 0
+
+        if process_running(pid):
+            return True
         time.sleep(0.2)
     return False
 
 
+_TAIL_BYTES = 2048
+
+
+def _tail_log(path: Path, count: int = 5) -> str:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return ""
+
+    try:
+        size = os.fstat(fd).st_size
+        os.lseek(fd, max(0, size - _TAIL_BYTES), os.SEEK_SET)
+        data = os.read(fd, _TAIL_BYTES).decode("utf-8", errors="ignore")
+    except OSError:
+        return ""
+    finally:
+        os.close(fd)
+
+    return "\n".join(data.strip().split("\n")[-count:])
+
+
 def _verify_services_running() -> tuple[bool, list[str]]:
     issues: list[str] = []
 
@@ -346,29 +381,15 @@ def _verify_services_running() -> tuple[bool, list[str]]:
         issues.append(
             f"dnsmasq not listening on {DNSMASQ_LISTEN_ADDR}:{DNSMASQ_LISTEN_PORT}"
         )
-        if SYSTEM_LOG_DIR.exists():
-            err_log = SYSTEM_LOG_DIR / "dnsmasq.err.log"
-            if err_log.exists():
-                try:
-                    content = err_log.read_text(encoding="utf-8").strip()
-                    if content:
-                        last_lines = "\n".join(content.split("\n")[-5:])
-                        issues.append(f"dnsmasq error log:\n{last_lines}")
-                except Exception:
-                    pass
+        last_lines = _tail_log(SYSTEM_LOG_DIR / "dnsmasq.err.log")
+        if last_lines:
+            issues.append(f"dnsmasq error log:\n{last_lines}")
 
     if not _wait_for_daemon_ready(timeout=5.0):
         issues.append("daemon not running (PID file missing or process not found)")
-        if SYSTEM_LOG_DIR.exists():
-            err_log = SYSTEM_LOG_DIR / "daemon.err.log"
-            if err_log.exists():
-                try:
-                    content = err_log.read_text(encoding="utf-8").strip()
-                    if content:
-                        last_lines = "\n".join(content.split("\n")[-5:])
-                        issues.append(f"daemon error log:\n{last_lines}")
-                except Exception:
-                    pass
+        last_lines = _tail_log(SYSTEM_LOG_DIR / "daemon.err.log")
+        if last_lines:
+            issues.append(f"daemon error log:\n{last_lines}")
 
     return len(issues) == 0, issues
 
@@ -415,47 +436,28 @@ def do_install(force: bool = False, skip_update: bool = False) -> int:
         spinner.succeed("Created directories")
 
     with Spinner("Writing configuration") as spinner:
-        if not SYSTEM_WHITELIST_FILE.exists():
-            atomic_write_text(SYSTEM_WHITELIST_FILE, "", mode=0o644)
-            _chown_root(SYSTEM_WHITELIST_FILE)
-
-        if not SYSTEM_BLACKLIST_FILE.exists():
-            atomic_write_text(SYSTEM_BLACKLIST_FILE, "", mode=0o644)
-            _chown_root(SYSTEM_BLACKLIST_FILE)
-
-        if not SYSTEM_BLOCKLIST_FILE.exists():
-            atomic_write_text(SYSTEM_BLOCKLIST_FILE, "", mode=0o644)
-            _chown_root(SYSTEM_BLOCKLIST_FILE)
-
-        if not SYSTEM_RAW_BLOCKLIST_FILE.exists():
-            atomic_write_text(SYSTEM_RAW_BLOCKLIST_FILE, "", mode=0o644)
-            _chown_root(SYSTEM_RAW_BLOCKLIST_FILE)
-
-        if not VAR_DB_UPSTREAM_CONF.exists():
-            atomic_write_text(
-                VAR_DB_UPSTREAM_CONF,
-                "server=1.1.1.1\nserver=1.0.0.1\n",
-                mode=0o644,
-            )
+        for p in [
+            SYSTEM_WHITELIST_FILE,
+            SYSTEM_BLACKLIST_FILE,
+            SYSTEM_BLOCKLIST_FILE,
+            SYSTEM_RAW_BLOCKLIST_FILE,
+        ]:
+            if _create_if_absent(p):
+                _chown_root(p)
+
+        _create_if_absent(VAR_DB_UPSTREAM_CONF, "server=1.1.1.1\nserver=1.0.0.1\n")
         _chown_root(VAR_DB_UPSTREAM_CONF)
 
-        if not SYSTEM_UPSTREAM_FALLBACKS_FILE.exists():
-            atomic_write_text(
-                SYSTEM_UPSTREAM_FALLBACKS_FILE,
-                render_fallback_upstreams(DEFAULT_UPSTREAM_FALLBACKS),
-                mode=0o644,
-            )
+        if _create_if_absent(
+            SYSTEM_UPSTREAM_FALLBACKS_FILE,
+            render_fallback_upstreams(DEFAULT_UPSTREAM_FALLBACKS),
+        ):
             _chown_root(SYSTEM_UPSTREAM_FALLBACKS_FILE)
 
-        atomic_write_text(SYSTEM_DNSMASQ_CONF, render_dnsmasq_conf(), mode=0o644)
-        _chown_root(SYSTEM_DNSMASQ_CONF)
-
-        if not SYSTEM_DNS_EXCLUDE_SERVICES_FILE.exists():
-            atomic_write_text(
-                SYSTEM_DNS_EXCLUDE_SERVICES_FILE,
-                "# One network service name per line (exact match)\n",
-                mode=0o644,
-            )
+        if _create_if_absent(
+            SYSTEM_DNS_EXCLUDE_SERVICES_FILE,
+            "# One network service name per line (exact match)\n",
+        ):
             _chown_root(SYSTEM_DNS_EXCLUDE_SERVICES_FILE)
 
         if not SYSTEM_STATE_FILE.exists():
@@ -472,17 +474,18 @@ def do_install(force: bool = False, skip_update: bool = False) -> int:
             )
             _chown_root(SYSTEM_STATE_FILE)
 
-        atomic_write_text(SYSTEM_VERSION_FILE, f"{__version__}\n", mode=0o644)
-        _chown_root(SYSTEM_VERSION_FILE)
-
-        dnsmasq_plist_content = _render_dnsmasq_plist(dnsmasq_bin)
-        daemon_plist_content = _render_daemon_plist(macblock_bin)
-
-        atomic_write_text(LAUNCHD_DNSMASQ_PLIST, dnsmasq_plist_content, mode=0o644)
-        _chown_root(LAUNCHD_DNSMASQ_PLIST)
-
-        atomic_write_text(LAUNCHD_DAEMON_PLIST, daemon_plist_content, mode=0o644)
-        _chown_root(LAUNCHD_DAEMON_PLIST)
+        # These files are independent of each other, so let their writes overlap.
+        writes = [
+            (SYSTEM_DNSMASQ_CONF, render_dnsmasq_conf().encode("utf-8")),
+            (SYSTEM_VERSION_FILE, f"{__version__}\n".encode("utf-8")),
+            (LAUNCHD_DNSMASQ_PLIST, _render_dnsmasq_plist(dnsmasq_bin)),
+            (LAUNCHD_DAEMON_PLIST, _render_daemon_plist(macblock_bin)),
+        ]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda w: atomic_write_bytes(*w, mode=0o644), writes))
+
+        for path, _data in writes:
+            _chown_root(path)
         spinner.succeed("Configuration written")
 
     with Spinner("Starting services") as spinner:
@@ -523,28 +526,42 @@ def do_install(force: bool = False, skip_update: bool = False) -> int:
     return 0
 
 
+_LOG_FILE_NAMES = (
+    "dnsmasq.out.log",
+    "dnsmasq.err.log",
+    "daemon.out.log",
+    "daemon.err.log",
+    "upstreams.out.log",
+    "upstreams.err.log",
+    "state.out.log",
+    "state.err.log",
+)
+
+
 def _remove_any_macblock_resolvers() -> None:
-    if not SYSTEM_RESOLVER_DIR.exists():
+    try:
+        entries = list(os.scandir(SYSTEM_RESOLVER_DIR))
+    except FileNotFoundError:
         return
 
-    for p in SYSTEM_RESOLVER_DIR.iterdir():
+    for entry in entries:
         try:
-            if not p.is_file():
+            if not entry.is_file():
                 continue
-        except Exception:
-            continue
-
-        try:
-            head = p.read_text(encoding="utf-8", errors="ignore")[:64]
-        except Exception:
+            fd = os.open(entry.path, os.O_RDONLY)
+            try:
+                head = os.read(fd, 64)
+            finally:
+                os.close(fd)
+        except OSError:
             continue
 
-        if not head.startswith("# macblock"):
+        if not head.startswith(b"# macblock"):
             continue
 
         try:
-            p.unlink()
-        except Exception:
+            os.unlink(entry.path)
+        except OSError:
             pass
 
 
@@ -556,8 +573,8 @@ def _restore_dns_from_state(st: State) -> None:
         dns_val = cfg.get("dns")
         search_val = cfg.get("search")
         backup = ServiceDnsBackup(
-            dns_servers=list(dns_val) if isinstance(dns_val, list) else None,
-            search_domains=list(search_val) if isinstance(search_val, list) else None,
+            dns_servers=dns_val if isinstance(dns_val, list) else None,
+            search_domains=search_val if isinstance(search_val, list) else None,
         )
         restore_from_backup(service, backup)
 
@@ -613,10 +630,10 @@ def do_uninstall(force: bool = False) -> int:
     with Spinner("Removing files") as spinner:
 
         def _unlink(p: Path) -> None:
-            if not p.exists():
-                return
             try:
                 p.unlink()
+            except FileNotFoundError:
+                pass
             except OSError as e:
                 if force:
                     file_leftovers.append(f"file {p}: {e}")
@@ -626,10 +643,10 @@ def do_uninstall(force: bool = False) -> int:
                     raise MacblockError(f"failed to remove {p}: {e}") from e
 
         def _rmdir(d: Path) -> None:
-            if not d.exists():
-                return
             try:
                 d.rmdir()
+            except FileNotFoundError:
+                pass
             except OSError as e:
                 if force:
                     dir_leftovers.append(f"dir {d}: {e}")
@@ -644,17 +661,9 @@ def do_uninstall(force: bool = False) -> int:
             LAUNCHD_UPSTREAMS_PLIST,
             LAUNCHD_STATE_PLIST,
             old_pf_plist,
-        ]:
-            _unlink(p)
-
-        for p in [
             old_bin_dir / "apply-state.py",
             old_bin_dir / "update-upstreams.py",
             old_bin_dir / "macblockd.py",
-        ]:
-            _unlink(p)
-
-        for p in [
             VAR_DB_DNSMASQ_PID,
             VAR_DB_DNSMASQ_DIR / "dnsmasq.log",
             VAR_DB_UPSTREAM_CONF,
@@ -677,17 +686,12 @@ def do_uninstall(force: bool = False) -> int:
             SYSTEM_VERSION_FILE,
             SYSTEM_DNS_EXCLUDE_SERVICES_FILE,
             SYSTEM_UPSTREAM_FALLBACKS_FILE,
-            SYSTEM_LOG_DIR / "dnsmasq.out.log",
-            SYSTEM_LOG_DIR / "dnsmasq.err.log",
-            SYSTEM_LOG_DIR / "daemon.out.log",
-            SYSTEM_LOG_DIR / "daemon.err.log",
-            SYSTEM_LOG_DIR / "upstreams.out.log",
-            SYSTEM_LOG_DIR / "upstreams.err.log",
-            SYSTEM_LOG_DIR / "state.out.log",
-            SYSTEM_LOG_DIR / "state.err.log",
         ]:
             _unlink(p)
 
+        for name in _LOG_FILE_NAMES:
+            _unlink(SYSTEM_LOG_DIR / name)
+
         for d in [old_bin_dir, SYSTEM_CONFIG_DIR, SYSTEM_LOG_DIR, SYSTEM_SUPPORT_DIR]:
             _rmdir(d)
 
@@ -710,7 +714,7 @@ def do_uninstall(force: bool = False) -> int:
         f"{APP_LABEL}.state",
         f"{APP_LABEL}.pf",
     ]:
-        if service_exists(label):
+        if service_loaded(label):
             leftovers.append(f"launchd {label}")
 
     if file_leftovers:
@@ -39,6 +39,6 @@ def kickstart(label: str) -> None:
     _launchctl(["kickstart", "-k", f"system/{label}"])
 
 
-def service_exists(label: str) -> bool:
+def service_loaded(label: str) -> bool:
     r = run(["/bin/launchctl", "print", f"system/{label}"], timeout=LAUNCHCTL_TIMEOUT)
     return r.returncode == 0
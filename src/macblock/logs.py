@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import os
+import re
+import select
 import sys
 import time
 from pathlib import Path
+from typing import TextIO
 
 from macblock.colors import Colors
 from macblock.constants import SYSTEM_LOG_DIR
@@ -108,56 +112,117 @@ def _resolve_log_path(*, component: str, stream: str) -> tuple[Path, str, list[P
     return primary, chosen, alternates
 
 
-def _colorize_line(line: str) -> str:
-    """Apply color to log line based on content."""
-    if not sys.stdout.isatty():
-        return line
+# Checked in priority order: a line mentioning both an error and a warning
+# is shown as an error.
+_ERROR_RE = re.compile(r"error|fail|fatal|exception|traceback", re.IGNORECASE)
+_WARNING_RE = re.compile(r"warn|caution", re.IGNORECASE)
+_SUCCESS_RE = re.compile(r"success|started|ready|enabled", re.IGNORECASE)
 
-    line_lower = line.lower()
 
-    # Error indicators
-    if any(
-        kw in line_lower for kw in ("error", "fail", "fatal", "exception", "traceback")
-    ):
+def _colorize_line(line: str) -> str:
+    """Apply color to log line based on content."""
+    if _ERROR_RE.search(line):
         return f"{Colors.RED}{line}{Colors.RESET}"
 
-    # Warning indicators
-    if any(kw in line_lower for kw in ("warn", "warning", "caution")):
+    if _WARNING_RE.search(line):
         return f"{Colors.YELLOW}{line}{Colors.RESET}"
 
-    # Success/info indicators
-    if any(kw in line_lower for kw in ("success", "started", "ready", "enabled")):
+    if _SUCCESS_RE.search(line):
         return f"{Colors.GREEN}{line}{Colors.RESET}"
 
     return line
 
 
+def _write_lines(lines: list[str], colorize: bool) -> None:
+    if colorize:
+        lines = [_colorize_line(line) for line in lines]
+    sys.stdout.write("".join(lines))
+    sys.stdout.flush()
+
+
+_TAIL_CHUNK = 64 * 1024
+# Lines end at "\n" only; str.splitlines would also break on \x0c, \u2028, etc.
+_LINE_RE = re.compile(rb"[^\n]*\n|[^\n]+\Z")
+
+
 def _tail_lines(path: Path, count: int) -> list[str]:
     """Read the last N lines from a file without loading whole file."""
     if count <= 0:
         return []
 
     try:
-        with path.open("rb") as f:
-            f.seek(0, 2)
-            pos = f.tell()
-
-            buf = b""
-            block = 8192
-            while pos > 0 and buf.count(b"\n") <= count:
-                read_size = block if pos >= block else pos
-                pos -= read_size
-                f.seek(pos)
-                chunk = f.read(read_size)
-                buf = chunk + buf
-
-            lines_b = buf.splitlines(keepends=True)[-count:]
-            return [b.decode("utf-8", errors="replace") for b in lines_b]
+        fd = os.open(path, os.O_RDONLY)
     except FileNotFoundError:
         raise MacblockError(f"log file not found: {path}")
     except PermissionError:
         raise MacblockError(f"permission denied reading: {path}")
 
+    # pread rather than mmap: if rotation truncates the log mid-read we get a
+    # short read instead of SIGBUS.
+    data = b""
+    try:
+        end = os.fstat(fd).st_size
+        newlines = 0
+        while end > 0 and newlines <= count:
+            start = max(0, end - _TAIL_CHUNK)
+            chunk = os.pread(fd, end - start, start)
+            if not chunk:
+                break
+            data = chunk + data
+            newlines += chunk.count(b"\n")
+            end = start
+    finally:
+        os.close(fd)
+
+    return [
+        line.decode("utf-8", errors="replace")
+        for line in _LINE_RE.findall(data)[-count:]
+    ]
+
+
+_FOLLOW_POLL_INTERVAL = 0.25
+# Upper bound on a single kqueue wait so the loop wakes up now and then even
+# if no vnode event is delivered.
+_FOLLOW_WAIT_TIMEOUT = 2.0
+
+
+def _open_follow(path: Path) -> TextIO:
+    return path.open("r", encoding="utf-8", errors="replace")
+
+
+def _reopen_follow(path: Path) -> TextIO:
+    while True:
+        try:
+            return _open_follow(path)
+        except FileNotFoundError:
+            time.sleep(_FOLLOW_POLL_INTERVAL)
+
+
+def _watch(f: TextIO) -> select.kqueue | None:
+    """Register a kqueue vnode watch on ``f``; None where kqueue is unavailable."""
+    if not hasattr(select, "kqueue"):
+        return None
+
+    kq = select.kqueue()
+    kev = select.kevent(
+        f.fileno(),
+        filter=select.KQ_FILTER_VNODE,
+        flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+        fflags=select.KQ_NOTE_WRITE
+        | select.KQ_NOTE_EXTEND
+        | select.KQ_NOTE_DELETE
+        | select.KQ_NOTE_RENAME,
+    )
+    kq.control([kev], 0, 0)
+    return kq
+
+
+def _wait_for_change(kq: select.kqueue) -> bool:
+    """Block until the watched file changes; True if it was deleted or renamed."""
+    events = kq.control(None, 1, _FOLLOW_WAIT_TIMEOUT)
+    gone = select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME
+    return any(ev.fflags & gone for ev in events)
+
 
 def _print_no_logs_hint(component: str, resolved_stream: str) -> None:
     if component == "daemon" and resolved_stream != "stderr":
@@ -219,11 +284,9 @@ def show_logs(
         _print_no_logs_hint(component.strip().lower(), resolved_stream)
         return 0
 
-    # Print initial lines with colorization
-    for line in chosen_lines:
-        print(_colorize_line(line), end="")
+    colorize = sys.stdout.isatty()
 
-    sys.stdout.flush()
+    _write_lines(chosen_lines, colorize)
 
     if not follow:
         return 0
@@ -232,22 +295,41 @@ def show_logs(
     sys.stderr.flush()
 
     try:
-        f = chosen_path.open("r", encoding="utf-8", errors="replace")
+        f = _open_follow(chosen_path)
     except FileNotFoundError:
         raise MacblockError(f"log file not found: {chosen_path}")
     except PermissionError:
         raise MacblockError(f"permission denied reading: {chosen_path}")
 
+    kq = None
+    rotated = False
     try:
-        with f:
-            f.seek(0, 2)
-            while True:
-                chunk = f.read()
-                if chunk:
-                    for line in chunk.splitlines(keepends=True):
-                        print(_colorize_line(line), end="")
-                    sys.stdout.flush()
-                time.sleep(0.25)
+        f.seek(0, 2)
+        kq = _watch(f)
+        while True:
+            chunk = f.read()
+            if chunk:
+                _write_lines(chunk.splitlines(keepends=True), colorize)
+
+            if rotated:
+                # The file was deleted or renamed (log rotation) and we have
+                # drained what was left; pick up the new file at the same path.
+                kq.close()
+                f.close()
+                f = _reopen_follow(chosen_path)
+                kq = _watch(f)
+                rotated = False
+                continue
+
+            if kq is None:
+                time.sleep(_FOLLOW_POLL_INTERVAL)
+                continue
+
+            rotated = _wait_for_change(kq)
     except KeyboardInterrupt:
         print("\n", file=sys.stderr)
         return 0
+    finally:
+        if kq is not None:
+            kq.close()
+        f.close()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import ctypes
+import functools
+import os
+
+
+_LIBPROC_PATH = "/usr/lib/libproc.dylib"
+
+# Headroom for processes started between sizing the pid buffer and filling it.
+_PID_SLACK = 64
+
+
+@functools.lru_cache(maxsize=1)
+def _libproc() -> ctypes.CDLL:
+    lib = ctypes.CDLL(_LIBPROC_PATH, use_errno=True)
+    lib.proc_listallpids.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.proc_listallpids.restype = ctypes.c_int
+    lib.proc_name.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint32]
+    lib.proc_name.restype = ctypes.c_int
+    return lib
+
+
+def find_process_by_name(name: str) -> int | None:
+    """Return the pid of a process whose name is exactly ``name``, if any.
+
+    Walks the process table in-process through libproc. Raises OSError when
+    libproc is unavailable or the pid list cannot be read, so callers can fall
+    back to pgrep.
+    """
+    lib = _libproc()
+
+    estimate = lib.proc_listallpids(None, 0)
+    if estimate <= 0:
+        raise OSError(ctypes.get_errno(), "proc_listallpids failed")
+
+    pids = (ctypes.c_int * (estimate + _PID_SLACK))()
+    count = lib.proc_listallpids(pids, ctypes.sizeof(pids))
+    if count <= 0:
+        raise OSError(ctypes.get_errno(), "proc_listallpids failed")
+
+    target = name.encode()
+    buf = ctypes.create_string_buffer(256)
+    for pid in pids[: min(count, len(pids))]:
+        if pid <= 0:
+            continue
+        n = lib.proc_name(pid, buf, ctypes.sizeof(buf))
+        if n > 0 and buf.raw[:n] == target:
+            return pid
+
+    return None
+
+
+def process_running(pid: int) -> bool:
+    """Return True if ``pid`` refers to a live process.
+
+    Probes with kill(pid, 0). PermissionError means the process exists but
+    belongs to someone else.
+    """
+    if pid <= 1:
+        return False
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import ipaddress
+import itertools
 import re
+from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -17,8 +19,9 @@ class Resolvers:
 
 def parse_scutil_dns(text: str) -> Resolvers:
     current_domain: str | None = None
-    defaults: list[str] = []
-    per_domain: dict[str, list[str]] = {}
+    # dicts as insertion-ordered sets
+    defaults: dict[str, None] = {}
+    per_domain: dict[str, dict[str, None]] = {}
 
     in_resolver = False
 
@@ -41,7 +44,7 @@ def parse_scutil_dns(text: str) -> Resolvers:
                 dom = parts[1].strip().strip(".")
                 if dom:
                     current_domain = dom
-                    per_domain.setdefault(dom, [])
+                    per_domain.setdefault(dom, {})
             continue
 
         if line.startswith("nameserver"):
@@ -52,14 +55,14 @@ def parse_scutil_dns(text: str) -> Resolvers:
             if ip in {"127.0.0.1", "::1", "0.0.0.0", "::"}:
                 continue
             if current_domain is None:
-                if ip not in defaults:
-                    defaults.append(ip)
+                defaults[ip] = None
             else:
-                lst = per_domain.setdefault(current_domain, [])
-                if ip not in lst:
-                    lst.append(ip)
+                per_domain.setdefault(current_domain, {})[ip] = None
 
-    return Resolvers(defaults=defaults, per_domain=per_domain)
+    return Resolvers(
+        defaults=list(defaults),
+        per_domain={dom: list(ips) for dom, ips in per_domain.items()},
+    )
 
 
 def read_system_resolvers() -> Resolvers:
@@ -68,14 +71,14 @@ def read_system_resolvers() -> Resolvers:
 
 
 def render_dnsmasq_upstreams(resolvers: Resolvers) -> str:
-    lines: list[str] = []
-    for ip in resolvers.defaults:
-        lines.append(f"server={ip}")
-
-    for dom, ips in sorted(resolvers.per_domain.items()):
-        for ip in ips:
-            lines.append(f"server=/{dom}/{ip}")
-
+    lines = itertools.chain(
+        (f"server={ip}" for ip in resolvers.defaults),
+        (
+            f"server=/{dom}/{ip}"
+            for dom, ips in sorted(resolvers.per_domain.items())
+            for ip in ips
+        ),
+    )
     return "\n".join(lines) + "\n"
 
 
@@ -93,24 +96,37 @@ def _is_ip(value: str) -> bool:
         return False
 
 
-def parse_upstream_conf(text: str) -> UpstreamConf:
-    defaults: list[str] = []
+# server=/domain/ip (per-domain rule) or server=<single token> (default).
+_SERVER_LINE_RE = re.compile(r"\s*server=(?:(/)|(\S*)\s*$)")
+
+
+def _parse_upstream_lines(lines: Iterable[str]) -> UpstreamConf:
+    defaults: dict[str, None] = {}
     per_domain = 0
 
-    for raw_line in text.splitlines():
-        line = raw_line.strip()
-        if not line.startswith("server="):
+    for raw_line in lines:
+        m = _SERVER_LINE_RE.match(raw_line)
+        if m is None:
             continue
 
-        server = line.removeprefix("server=")
-        if server.startswith("/"):
+        if m.group(1):
             per_domain += 1
             continue
 
-        if _is_ip(server) and server not in defaults:
-            defaults.append(server)
+        server = m.group(2)
+        if server not in defaults and _is_ip(server):
+            defaults[server] = None
+
+    return UpstreamConf(defaults=list(defaults), per_domain_rule_count=per_domain)
+
+
+def parse_upstream_conf(text: str) -> UpstreamConf:
+    return _parse_upstream_lines(text.splitlines())
+
 
-    return UpstreamConf(defaults=defaults, per_domain_rule_count=per_domain)
+def read_upstream_conf(path: Path) -> UpstreamConf:
+    with path.open(encoding="utf-8", errors="replace") as f:
+        return _parse_upstream_lines(f)
 
 
 def parse_fallback_upstreams(text: str) -> list[str]:
@@ -119,7 +135,7 @@ def parse_fallback_upstreams(text: str) -> list[str]:
 
 
 def parse_fallback_upstreams_with_invalid(text: str) -> tuple[list[str], list[str]]:
-    ips: list[str] = []
+    ips: dict[str, None] = {}
     invalid: list[str] = []
 
     for raw_line in text.splitlines():
@@ -132,13 +148,12 @@ def parse_fallback_upstreams_with_invalid(text: str) -> tuple[list[str], list[st
             continue
 
         for token in line.replace(",", " ").split():
-            if _is_ip(token):
-                if token not in ips:
-                    ips.append(token)
+            if token in ips or _is_ip(token):
+                ips[token] = None
             else:
                 invalid.append(token)
 
-    return ips, invalid
+    return list(ips), invalid
 
 
 def read_fallback_upstreams(path: Path) -> list[str]:
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import calendar
+import functools
 import json
+import os
 import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -8,7 +11,7 @@ from pathlib import Path
 from typing import Any
 
 from macblock.errors import MacblockError
-from macblock.fs import atomic_write_text
+from macblock.fs import atomic_write_bytes
 
 # Schema version for state.json - increment when making breaking changes.
 # Both CLI (state.py) and daemon (macblockd.py.tmpl) must agree on this.
@@ -25,8 +28,66 @@ class State:
     managed_services: list[str]
 
 
+def _iso_to_epoch_seconds_fast(value: str) -> int | None:
+    # Fixed-shape YYYY-MM-DDTHH:MM:SS with an optional Z or +HH:MM/-HH:MM
+    # suffix, which is what we write ourselves.
+    if len(value) < 19 or value[4] != "-" or value[7] != "-":
+        return None
+    if value[10] not in "T " or value[13] != ":" or value[16] != ":":
+        return None
+
+    suffix = value[19:]
+    if suffix in ("", "Z"):
+        tz_digits = ""
+    elif len(suffix) == 6 and suffix[0] in "+-" and suffix[3] == ":":
+        tz_digits = suffix[1:3] + suffix[4:6]
+    else:
+        return None
+
+    # int() alone would accept signs and spaces inside a field.
+    digits = (
+        value[0:4]
+        + value[5:7]
+        + value[8:10]
+        + value[11:13]
+        + value[14:16]
+        + value[17:19]
+        + tz_digits
+    )
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+
+    offset = 0
+    if tz_digits:
+        tz_hours, tz_minutes = int(tz_digits[0:2]), int(tz_digits[2:4])
+        if tz_hours > 23 or tz_minutes > 59:
+            return None
+        offset = tz_hours * 3600 + tz_minutes * 60
+        if suffix[0] == "-":
+            offset = -offset
+
+    fields = (
+        int(digits[0:4]),
+        int(digits[4:6]),
+        int(digits[6:8]),
+        int(digits[8:10]),
+        int(digits[10:12]),
+        int(digits[12:14]),
+    )
+    if not 1 <= fields[1] <= 12:
+        return None
+    if not 1 <= fields[2] <= calendar.monthrange(fields[0], fields[1])[1]:
+        return None
+    if fields[3] > 23 or fields[4] > 59 or fields[5] > 59:
+        return None
+    return calendar.timegm((*fields, 0, 0, 0)) - offset
+
+
 def _iso_to_epoch_seconds(value: str) -> int | None:
     try:
+        fast = _iso_to_epoch_seconds_fast(value)
+        if fast is not None:
+            return fast
         if value.endswith("Z"):
             value = value[:-1] + "+00:00"
         dt = datetime.fromisoformat(value)
@@ -38,7 +99,14 @@ def _iso_to_epoch_seconds(value: str) -> int | None:
 
 
 def load_state(path: Path) -> State:
-    if not path.exists():
+    """Load state.json; repeated loads of an unchanged file reuse the result.
+
+    The returned State is shared between callers and must be treated as
+    read-only (use replace_state to derive a modified copy).
+    """
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
         return State(
             schema_version=2,
             enabled=False,
@@ -47,7 +115,18 @@ def load_state(path: Path) -> State:
             dns_backup={},
             managed_services=[],
         )
+    except OSError:
+        return _read_state(path)
+
+    return _load_state_cached(path, st.st_ino, st.st_mtime_ns, st.st_size)
+
 
+@functools.lru_cache(maxsize=4)
+def _load_state_cached(path: Path, _ino: int, _mtime_ns: int, _size: int) -> State:
+    return _read_state(path)
+
+
+def _read_state(path: Path) -> State:
     try:
         raw_text = path.read_text(encoding="utf-8")
     except (OSError, UnicodeDecodeError) as e:
@@ -141,7 +220,7 @@ def replace_state(st: State, **updates: Any) -> State:
     return State(**payload)
 
 
-def save_state_atomic(path: Path, state: State) -> None:
+def _encode_state(state: State) -> bytes:
     payload: dict[str, Any] = {
         "schema_version": state.schema_version,
         "enabled": state.enabled,
@@ -151,8 +230,16 @@ def save_state_atomic(path: Path, state: State) -> None:
         "managed_services": state.managed_services,
     }
 
-    atomic_write_text(
-        path,
-        json.dumps(payload, indent=2, sort_keys=True) + "\n",
-        mode=0o644,
-    )
+    return json.dumps(payload, indent=2, sort_keys=True).encode("utf-8") + b"\n"
+
+
+def state_file_matches(path: Path, state: State) -> bool:
+    """Return True if ``path`` already holds what save_state_atomic would write."""
+    try:
+        return path.read_bytes() == _encode_state(state)
+    except OSError:
+        return False
+
+
+def save_state_atomic(path: Path, state: State) -> None:
+    atomic_write_bytes(path, _encode_state(state), mode=0o644)
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import json
 import time
-from datetime import datetime
 
 from macblock.constants import (
     APP_LABEL,
@@ -19,9 +18,11 @@ from macblock.constants import (
 )
 from macblock.errors import MacblockError
 from macblock.exec import run
-from macblock.resolvers import parse_upstream_conf, read_fallback_upstreams
+from macblock.fs import count_lines, existing_paths
+from macblock.process import find_process_by_name, process_running
+from macblock.resolvers import read_fallback_upstreams, read_upstream_conf
 from macblock.state import State, load_state
-from macblock.system_dns import get_dns_servers
+from macblock.system_dns import get_dns_servers_many
 from macblock.ui import (
     dns_status,
     header,
@@ -43,8 +44,6 @@ def _format_list(items: list[str], *, max_items: int = 4) -> str:
 
 
 def _read_upstream_info() -> dict | None:
-    if not VAR_DB_UPSTREAM_INFO.exists():
-        return None
     try:
         raw = VAR_DB_UPSTREAM_INFO.read_text(encoding="utf-8", errors="replace")
         return json.loads(raw)
@@ -53,34 +52,28 @@ def _read_upstream_info() -> dict | None:
 
 
 def _read_pid(path) -> int | None:
-    if not path.exists():
+    try:
+        raw = path.read_bytes()
+    except OSError:
         return None
     try:
-        pid = int(path.read_text(encoding="utf-8").strip())
-        return pid if pid > 1 else None
-    except Exception:
+        pid = int(raw.strip())
+    except ValueError:
         return None
+    return pid if pid > 1 else None
 
 
-def _process_running(pid: int) -> bool:
-    if pid <= 1:
-        return False
+def _unmanaged_dnsmasq_running() -> bool:
     try:
-        import os
-
-        os.kill(pid, 0)
-        return True
-    except ProcessLookupError:
-        return False
-    except PermissionError:
-        return True
+        return find_process_by_name("dnsmasq") is not None
+    except OSError:
+        r = run(["/usr/bin/pgrep", "-x", "dnsmasq"])
+        return r.returncode == 0
 
 
 def _get_blocklist_count() -> int:
-    if not SYSTEM_BLOCKLIST_FILE.exists():
-        return 0
     try:
-        return len(SYSTEM_BLOCKLIST_FILE.read_text().splitlines())
+        return count_lines(SYSTEM_BLOCKLIST_FILE)
     except Exception:
         return 0
 
@@ -122,39 +115,32 @@ def show_status() -> int:
 
         # Resume timer
         if st.resume_at_epoch is not None:
-            when = datetime.fromtimestamp(st.resume_at_epoch)
-            status_info("Resume at", when.strftime("%H:%M:%S"))
+            h, m, s = time.localtime(st.resume_at_epoch)[3:6]
+            status_info("Resume at", f"{h:02d}:{m:02d}:{s:02d}")
 
     # dnsmasq process
     subheader("Services")
 
     dnsmasq_pid = _read_pid(VAR_DB_DNSMASQ_PID)
-    if dnsmasq_pid and _process_running(dnsmasq_pid):
+    if dnsmasq_pid and process_running(dnsmasq_pid):
         status_ok("dnsmasq", f"running (PID {dnsmasq_pid})")
+    elif _unmanaged_dnsmasq_running():
+        status_warn("dnsmasq", "running (not managed by macblock)")
     else:
-        r = run(["/usr/bin/pgrep", "-x", "dnsmasq"])
-        if r.returncode == 0:
-            status_warn("dnsmasq", "running (not managed by macblock)")
-        else:
-            status_err("dnsmasq", "not running")
+        status_err("dnsmasq", "not running")
 
     # Daemon process
     daemon_pid = _read_pid(VAR_DB_DAEMON_PID)
-    if daemon_pid and _process_running(daemon_pid):
+    if daemon_pid and process_running(daemon_pid):
         status_ok("daemon", f"running (PID {daemon_pid})")
     else:
         status_err("daemon", "not running")
 
-    if VAR_DB_DAEMON_LAST_APPLY.exists():
-        try:
-            last_apply = int(
-                VAR_DB_DAEMON_LAST_APPLY.read_text(encoding="utf-8").strip()
-            )
-            age_s = max(0, int(time.time()) - last_apply)
-            status_info("Last apply", f"{age_s}s ago")
-        except Exception:
-            status_warn("Last apply", "unknown")
-    else:
+    try:
+        last_apply = int(VAR_DB_DAEMON_LAST_APPLY.read_text(encoding="utf-8").strip())
+        age_s = max(0, int(time.time()) - last_apply)
+        status_info("Last apply", f"{age_s}s ago")
+    except Exception:
         status_warn("Last apply", "unknown")
 
     # Blocklist
@@ -177,26 +163,21 @@ def show_status() -> int:
         subheader("DNS Configuration")
 
         is_blocking = st.enabled and not paused
+        servers_by_svc = get_dns_servers_many(st.managed_services)
         for svc in st.managed_services:
-            servers = get_dns_servers(svc)
-            dns_status(svc, servers, is_active=True, is_blocking=is_blocking)
+            dns_status(
+                svc, servers_by_svc[svc], is_active=True, is_blocking=is_blocking
+            )
 
     subheader("Upstream DNS")
 
     upstream_conf = None
-    if VAR_DB_UPSTREAM_CONF.exists():
-        try:
-            upstream_text = VAR_DB_UPSTREAM_CONF.read_text(
-                encoding="utf-8", errors="replace"
-            )
-            upstream_conf = parse_upstream_conf(upstream_text)
-        except Exception:
-            upstream_conf = None
-
-        if upstream_conf is None:
-            status_warn("upstream.conf", "unreadable")
-    else:
+    try:
+        upstream_conf = read_upstream_conf(VAR_DB_UPSTREAM_CONF)
+    except FileNotFoundError:
         status_warn("upstream.conf", "not found")
+    except Exception:
+        status_warn("upstream.conf", "unreadable")
 
     upstream_info = _read_upstream_info()
     if upstream_info and isinstance(upstream_info, dict):
@@ -254,8 +235,9 @@ def show_status() -> int:
     subheader("Installation")
 
     daemon_plist = LAUNCHD_DIR / f"{APP_LABEL}.daemon.plist"
-    dnsmasq_plist_exists = LAUNCHD_DNSMASQ_PLIST.exists()
-    daemon_plist_exists = daemon_plist.exists()
+    present = existing_paths([LAUNCHD_DNSMASQ_PLIST, daemon_plist])
+    dnsmasq_plist_exists = LAUNCHD_DNSMASQ_PLIST in present
+    daemon_plist_exists = daemon_plist in present
 
     if dnsmasq_plist_exists and daemon_plist_exists:
         status_ok("Launchd", "installed")
@@ -1,13 +1,25 @@
 from __future__ import annotations
 
 import re
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import TypeVar, cast
 
 from macblock.exec import run
 
 
 _LOCALHOST_DNS_V4 = ["127.0.0.1"]
 
+# Per-service networksetup reads are reused for a short window so that one
+# status render or apply pass does not fork the same query repeatedly. The
+# setters drop the affected entries; the daemon clears everything per pass.
+_QUERY_TTL_S = 2.0
+_query_cache: dict[tuple[str, str], tuple[float, object]] = {}
+
+_T = TypeVar("_T")
+
 
 @dataclass(frozen=True)
 class ServiceDnsBackup:
@@ -22,18 +34,33 @@ class ServiceInfo:
     device: str | None
 
 
-def _parse_networksetup_listallnetworkservices(text: str) -> list[str]:
-    services: list[str] = []
-    for raw in text.splitlines():
-        line = raw.rstrip("\n")
-        if not line.strip():
-            continue
-        if line.startswith("An asterisk"):
-            continue
-        if line.startswith("*"):
-            continue
-        services.append(line.strip())
-    return services
+def clear_query_cache() -> None:
+    _query_cache.clear()
+
+
+def _cached_query(kind: str, service: str, fetch: Callable[[str], _T]) -> _T:
+    key = (kind, service)
+    now = time.monotonic()
+    hit = _query_cache.get(key)
+    if hit is not None and now - hit[0] < _QUERY_TTL_S:
+        return cast(_T, hit[1])
+    value = fetch(service)
+    _query_cache[key] = (now, value)
+    return value
+
+
+def _copy(values: list[str] | None) -> list[str] | None:
+    # Callers own the returned list; keep the cached one untouched.
+    return list(values) if values is not None else None
+
+
+# Non-blank lines, minus the header and disabled services (marked with "*").
+_LISTALL_SERVICE_RE = re.compile(r"^(?!An asterisk|\*)(.*\S.*)$", re.MULTILINE)
+
+
+def _parse_networksetup_listallnetworkservices(text: str) -> Iterator[str]:
+    for m in _LISTALL_SERVICE_RE.finditer(text):
+        yield m.group(1).strip()
 
 
 def _parse_networksetup_listnetworkserviceorder(text: str) -> dict[str, str | None]:
@@ -45,6 +72,12 @@ def _parse_networksetup_listnetworkserviceorder(text: str) -> dict[str, str | No
         if not line:
             continue
 
+        if line.startswith("(*)"):
+            # Disabled service; do not attribute its device line to the
+            # previous entry.
+            current_service = None
+            continue
+
         m = re.match(r"^\(\d+\)\s+(.*)$", line)
         if m:
             current_service = m.group(1).strip()
@@ -67,7 +100,7 @@ def list_enabled_network_services() -> list[str]:
     r = run(["/usr/sbin/networksetup", "-listallnetworkservices"])
     if r.returncode != 0:
         return []
-    return _parse_networksetup_listallnetworkservices(r.stdout)
+    return list(_parse_networksetup_listallnetworkservices(r.stdout))
 
 
 def list_network_service_devices() -> dict[str, str | None]:
@@ -78,16 +111,14 @@ def list_network_service_devices() -> dict[str, str | None]:
 
 
 def _parse_getinfo_device(text: str) -> str | None:
-    for raw in text.splitlines():
+    for raw in text.split("\n"):
         line = raw.strip()
-        if not line.startswith("Device:"):
-            continue
-        device = line.split(":", 1)[1].strip()
-        return device or None
+        if line.startswith("Device:"):
+            return line[len("Device:") :].strip() or None
     return None
 
 
-def get_service_info(service: str) -> ServiceInfo:
+def _fetch_service_info(service: str) -> ServiceInfo:
     device = list_network_service_devices().get(service)
     if device is None:
         r = run(["/usr/sbin/networksetup", "-getinfo", service])
@@ -95,63 +126,192 @@ def get_service_info(service: str) -> ServiceInfo:
     return ServiceInfo(name=service, device=device)
 
 
-def _parse_getdnsservers(text: str) -> list[str] | None:
-    out = text.strip()
-    if not out:
-        return None
+def get_service_info(service: str) -> ServiceInfo:
+    return _cached_query("info", service, _fetch_service_info)
+
 
-    if "There aren't any DNS Servers" in out:
+def _parse_getdnsservers(text: str) -> list[str] | None:
+    if "There aren't any DNS Servers" in text:
         return None
 
-    servers: list[str] = []
-    for raw in out.splitlines():
-        ip = raw.strip()
-        if not ip:
-            continue
-        servers.append(ip)
+    servers = [ip for ip in (raw.strip() for raw in text.split("\n")) if ip]
     return servers or None
 
 
-def get_dns_servers(service: str) -> list[str] | None:
+def _fetch_dns_servers(service: str) -> list[str] | None:
     r = run(["/usr/sbin/networksetup", "-getdnsservers", service])
     return _parse_getdnsservers(r.stdout if r.returncode == 0 else "")
 
 
+def get_dns_servers(service: str) -> list[str] | None:
+    return _copy(_cached_query("dns", service, _fetch_dns_servers))
+
+
+_SCUTIL = "/usr/sbin/scutil"
+_SETUP_SERVICE_PREFIX = "Setup:/Network/Service/"
+_SCUTIL_SUBKEY_RE = re.compile(
+    r"^\s*subKey \[\d+\] = (Setup:/Network/Service/[^/\s]+)$"
+)
+
+
+def _split_scutil_show(text: str) -> list[list[str]]:
+    """Split the output of consecutive scutil ``show`` commands into replies.
+
+    Each reply is the body of a top-level ``<dictionary> { ... }`` block, or an
+    empty list for ``No such key``.
+    """
+    replies: list[list[str]] = []
+    block: list[str] | None = None
+
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        if block is not None:
+            if line == "}":
+                replies.append(block)
+                block = None
+            else:
+                block.append(line)
+            continue
+
+        stripped = line.strip()
+        if stripped == "No such key":
+            replies.append([])
+        elif stripped == "<dictionary> {":
+            block = []
+
+    return replies
+
+
+def _scutil_top_level_value(block: list[str], key: str) -> str | None:
+    prefix = f"  {key} : "
+    for line in block:
+        if line.startswith(prefix):
+            return line[len(prefix) :].strip()
+    return None
+
+
+def _scutil_top_level_array(block: list[str], key: str) -> list[str] | None:
+    start = f"  {key} : <array> {{"
+    values: list[str] | None = None
+
+    for line in block:
+        if values is None:
+            if line == start:
+                values = []
+            continue
+        if line == "  }":
+            break
+        _, sep, value = line.partition(" : ")
+        if sep and value.strip():
+            values.append(value.strip())
+
+    return values or None
+
+
+def _scutil_setup_dns() -> dict[str, list[str] | None] | None:
+    """Map service name to configured DNS servers using two scutil sessions.
+
+    Returns None if scutil is unavailable or its output cannot be parsed, so
+    callers can fall back to per-service networksetup queries.
+    """
+    r = run([_SCUTIL], input=f"list {_SETUP_SERVICE_PREFIX}[^/]+$\n")
+    if r.returncode != 0:
+        return None
+
+    keys = [
+        m.group(1)
+        for m in map(_SCUTIL_SUBKEY_RE.match, r.stdout.splitlines())
+        if m is not None
+    ]
+    if not keys:
+        return None
+
+    script = "".join(f"show {k}\nshow {k}/DNS\n" for k in keys)
+    r = run([_SCUTIL], input=script)
+    if r.returncode != 0:
+        return None
+
+    replies = _split_scutil_show(r.stdout)
+    if len(replies) != 2 * len(keys):
+        return None
+
+    result: dict[str, list[str] | None] = {}
+    ambiguous: set[str] = set()
+    for i in range(len(keys)):
+        name = _scutil_top_level_value(replies[2 * i], "UserDefinedName")
+        if not name:
+            continue
+        if name in result:
+            ambiguous.add(name)
+        result[name] = _scutil_top_level_array(replies[2 * i + 1], "ServerAddresses")
+
+    for name in ambiguous:
+        del result[name]
+    return result
+
+
+def get_dns_servers_many(
+    services: list[str], fresh: bool = False
+) -> dict[str, list[str] | None]:
+    """Return the configured DNS servers for several services at once.
+
+    For more than two services this costs two scutil runs instead of one
+    networksetup run per service; anything scutil cannot answer falls back to
+    get_dns_servers(), run concurrently. Pass fresh=True when polling for a
+    change so cached reads are not reused.
+    """
+    if fresh:
+        for svc in services:
+            _query_cache.pop(("dns", svc), None)
+
+    known = _scutil_setup_dns() if len(services) > 2 else None
+    if known is None:
+        known = {}
+
+    missing = [svc for svc in services if svc not in known]
+    if len(missing) > 1:
+        # networksetup calls are independent and spend their time in the child.
+        with ThreadPoolExecutor(max_workers=min(len(missing), 8)) as pool:
+            known.update(zip(missing, pool.map(get_dns_servers, missing)))
+    elif missing:
+        known[missing[0]] = get_dns_servers(missing[0])
+
+    return {svc: known[svc] for svc in services}
+
+
 def set_dns_servers(service: str, servers: list[str] | None) -> bool:
     if servers:
         args = ["/usr/sbin/networksetup", "-setdnsservers", service, *servers]
     else:
         args = ["/usr/sbin/networksetup", "-setdnsservers", service, "Empty"]
+    _query_cache.pop(("dns", service), None)
     r = run(args)
     return r.returncode == 0
 
 
 def _parse_getsearchdomains(text: str) -> list[str] | None:
-    out = text.strip()
-    if not out:
+    if "There aren't any Search Domains" in text:
         return None
 
-    if "There aren't any Search Domains" in out:
-        return None
-
-    domains: list[str] = []
-    for raw in out.splitlines():
-        dom = raw.strip().strip(".")
-        if dom:
-            domains.append(dom)
+    domains = [d for d in (raw.strip().strip(".") for raw in text.split("\n")) if d]
     return domains or None
 
 
-def get_search_domains(service: str) -> list[str] | None:
+def _fetch_search_domains(service: str) -> list[str] | None:
     r = run(["/usr/sbin/networksetup", "-getsearchdomains", service])
     return _parse_getsearchdomains(r.stdout if r.returncode == 0 else "")
 
 
+def get_search_domains(service: str) -> list[str] | None:
+    return _copy(_cached_query("search", service, _fetch_search_domains))
+
+
 def set_search_domains(service: str, domains: list[str] | None) -> bool:
     if domains:
         args = ["/usr/sbin/networksetup", "-setsearchdomains", service, *domains]
     else:
         args = ["/usr/sbin/networksetup", "-setsearchdomains", service, "Empty"]
+    _query_cache.pop(("search", service), None)
     r = run(args)
     return r.returncode == 0
 
@@ -160,24 +320,28 @@ def is_localhost_dns(servers: list[str] | None) -> bool:
     return servers == _LOCALHOST_DNS_V4
 
 
+_VPN_SERVICE_RE = re.compile(r"vpn|tailscale|wireguard|anyconnect", re.IGNORECASE)
+_PHYSICAL_SERVICE_RE = re.compile(r"wi-?fi|ethernet|usb|thunderbolt", re.IGNORECASE)
+
+
 def compute_managed_services(*, exclude: set[str] | None = None) -> list[ServiceInfo]:
     exclude = exclude or set()
 
     managed: list[ServiceInfo] = []
-    device_map = list_network_service_devices()
+    # -listnetworkserviceorder names every enabled service together with its
+    # device, so one call covers both; -listallnetworkservices is only a
+    # fallback if it fails.
+    device_map = list_network_service_devices() or dict.fromkeys(
+        list_enabled_network_services()
+    )
 
-    for service in list_enabled_network_services():
+    for service, device in device_map.items():
         if service in exclude:
             continue
 
-        service_l = service.lower()
-        if any(
-            x in service_l
-            for x in ("vpn", "tailscale", "wireguard", "openvpn", "anyconnect")
-        ):
+        if _VPN_SERVICE_RE.search(service):
             continue
 
-        device = device_map.get(service)
         if device is None:
             r = run(["/usr/sbin/networksetup", "-getinfo", service])
             device = _parse_getinfo_device(r.stdout if r.returncode == 0 else "")
@@ -192,9 +356,7 @@ def compute_managed_services(*, exclude: set[str] | None = None) -> list[Service
             managed.append(info)
             continue
 
-        if any(
-            x in service_l for x in ("wi-fi", "wifi", "ethernet", "usb", "thunderbolt")
-        ):
+        if _PHYSICAL_SERVICE_RE.search(service):
             managed.append(info)
 
     return sorted(managed, key=lambda x: x.name.lower())
@@ -231,7 +393,11 @@ def parse_exclude_services_file(text: str) -> set[str]:
     return exclude
 
 
-_IP_RE = re.compile(r"^(?:\d{1,3}\.){3}\d{1,3}$")
+def _is_ipv4(token: str) -> bool:
+    parts = token.split(".")
+    return len(parts) == 4 and all(
+        0 < len(p) <= 3 and p.isascii() and p.isdigit() and int(p) < 256 for p in parts
+    )
 
 
 def read_dhcp_nameservers(device: str) -> list[str]:
@@ -241,8 +407,5 @@ def read_dhcp_nameservers(device: str) -> list[str]:
     if r.returncode != 0:
         return []
 
-    ips: list[str] = []
-    for token in (r.stdout or "").strip().split():
-        if _IP_RE.match(token) and token not in ips and token != "127.0.0.1":
-            ips.append(token)
-    return ips
+    tokens = dict.fromkeys((r.stdout or "").split())
+    return [t for t in tokens if t != "127.0.0.1" and _is_ipv4(t)]
@@ -23,8 +23,17 @@ class Colors:
     RESET = "\033[0m"
 
 
+_tty_cache: tuple[object, bool] | None = None
+
+
 def _is_tty() -> bool:
-    return sys.stdout.isatty()
+    # isatty() is a syscall and _color() runs for every styled fragment;
+    # remember the answer for as long as sys.stdout is the same stream.
+    global _tty_cache
+    out = sys.stdout
+    if _tty_cache is None or _tty_cache[0] is not out:
+        _tty_cache = (out, out.isatty())
+    return _tty_cache[1]
 
 
 def _color(text: str, *styles: str) -> str:
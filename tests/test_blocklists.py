@@ -255,7 +255,7 @@ def test_reload_dnsmasq_raises_when_hup_fails(
     pid_file.write_text("123\n", encoding="utf-8")
 
     monkeypatch.setattr(blocklists, "VAR_DB_DNSMASQ_PID", pid_file)
-    monkeypatch.setattr(blocklists, "service_exists", lambda _label: False)
+    monkeypatch.setattr(blocklists, "service_loaded", lambda _label: False)
 
     from macblock.exec import RunResult
 
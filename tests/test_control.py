@@ -1,4 +1,11 @@
+import time
+
+import pytest
+
+import macblock.control as control
+import macblock.system_dns as system_dns
 from macblock.control import _atomic_write
+from macblock.exec import RunResult
 
 
 def test_atomic_write_pins_mode(tmp_path) -> None:
@@ -6,3 +13,20 @@ def test_atomic_write_pins_mode(tmp_path) -> None:
     _atomic_write(path, "hello\n")
     assert path.read_text(encoding="utf-8") == "hello\n"
     assert (path.stat().st_mode & 0o777) == 0o644
+
+
+def test_wait_for_dns_localhost_polls_past_cached_reads(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        control,
+        "compute_managed_services",
+        lambda: [system_dns.ServiceInfo(name="Wi-Fi", device="en0")],
+    )
+    monkeypatch.setattr(control.time, "sleep", lambda _s: None)
+    monkeypatch.setattr(
+        system_dns, "_query_cache", {("dns", "Wi-Fi"): (time.monotonic(), ["1.1.1.1"])}
+    )
+    monkeypatch.setattr(system_dns, "run", lambda _cmd: RunResult(0, "127.0.0.1\n", ""))
+
+    assert control._wait_for_dns_localhost(timeout=0.2) == (True, [])
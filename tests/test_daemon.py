@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+import json
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
 
 import pytest
 
@@ -6,16 +9,62 @@ import macblock.daemon as daemon
 from macblock.errors import MacblockError
 from macblock.exec import RunResult
 from macblock.state import State, load_state
+from macblock.system_dns import ServiceInfo
 
 
-@dataclass
-class _ServiceInfo:
-    name: str
-    device: str | None = None
+@pytest.fixture
+def fixed_clock(monkeypatch: pytest.MonkeyPatch) -> float:
+    now = 1000.0
+    monkeypatch.setattr(daemon.time, "time", lambda: now)
+    return now
+
+
+@pytest.fixture
+def daemon_paths(tmp_path, monkeypatch: pytest.MonkeyPatch) -> tuple[Path, Path]:
+    state_file = tmp_path / "state.json"
+    upstream_conf = tmp_path / "upstream.conf"
+    monkeypatch.setattr(daemon, "SYSTEM_STATE_FILE", state_file)
+    monkeypatch.setattr(daemon, "VAR_DB_UPSTREAM_CONF", upstream_conf)
+    return state_file, upstream_conf
+
+
+@pytest.fixture
+def stubbed_daemon(
+    monkeypatch: pytest.MonkeyPatch,
+) -> list[tuple[list[str], float | None]]:
+    """Stub what _apply_state touches besides DNS; returns the recorded run calls."""
+    run_calls: list[tuple[list[str], float | None]] = []
+
+    def _run(cmd: list[str], *, timeout: float | None = 10.0) -> RunResult:
+        run_calls.append((cmd, timeout))
+        return RunResult(returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(
+        daemon,
+        "compute_managed_services",
+        lambda exclude=None: [ServiceInfo("Wi-Fi", "en0")],
+    )
+    monkeypatch.setattr(daemon, "_update_upstreams", lambda _state: False)
+    monkeypatch.setattr(daemon, "_hup_dnsmasq", lambda: True)
+    monkeypatch.setattr(daemon, "run", _run)
+    return run_calls
+
+
+def _mk_state(**overrides: Any) -> State:
+    # Fresh containers per call: State is frozen, but its dict/list fields are not.
+    base = State(
+        schema_version=2,
+        enabled=False,
+        resume_at_epoch=None,
+        blocklist_source=None,
+        dns_backup={},
+        managed_services=[],
+    )
+    return replace(base, **overrides)
 
 
 def test_marker_files_written_atomically(
-    tmp_path, monkeypatch: pytest.MonkeyPatch
+    tmp_path, monkeypatch: pytest.MonkeyPatch, fixed_clock: float
 ) -> None:
     pid_path = tmp_path / "daemon.pid"
     ready_path = tmp_path / "daemon.ready"
@@ -26,7 +75,6 @@ def test_marker_files_written_atomically(
     monkeypatch.setattr(daemon, "VAR_DB_DAEMON_LAST_APPLY", last_apply_path)
 
     monkeypatch.setattr(daemon.os, "getpid", lambda: 1234)
-    monkeypatch.setattr(daemon.time, "time", lambda: 1000.0)
 
     calls: list[tuple[object, object, object]] = []
 
@@ -47,36 +95,20 @@ def test_marker_files_written_atomically(
 
 
 def test_seconds_until_resume_none_when_disabled(monkeypatch: pytest.MonkeyPatch):
-    st = State(
-        schema_version=2,
-        enabled=False,
-        resume_at_epoch=None,
-        blocklist_source=None,
-        dns_backup={},
-        managed_services=[],
-    )
+    st = _mk_state()
     assert daemon._seconds_until_resume(st) is None
 
 
-def test_seconds_until_resume_counts_down(monkeypatch: pytest.MonkeyPatch):
-    monkeypatch.setattr(daemon.time, "time", lambda: 1000.0)
-    st = State(
-        schema_version=2,
-        enabled=True,
-        resume_at_epoch=1030,
-        blocklist_source=None,
-        dns_backup={},
-        managed_services=[],
-    )
+def test_seconds_until_resume_counts_down(fixed_clock: float):
+    st = _mk_state(enabled=True, resume_at_epoch=1030)
     assert daemon._seconds_until_resume(st) == 30.0
 
 
 def test_update_upstreams_writes_defaults_and_per_domain(
-    tmp_path, monkeypatch: pytest.MonkeyPatch
+    tmp_path, monkeypatch: pytest.MonkeyPatch, daemon_paths: tuple[Path, Path]
 ):
-    upstream_conf = tmp_path / "upstream.conf"
+    _state_file, upstream_conf = daemon_paths
     upstream_info = tmp_path / "upstream.info.json"
-    monkeypatch.setattr(daemon, "VAR_DB_UPSTREAM_CONF", upstream_conf)
     monkeypatch.setattr(daemon, "VAR_DB_UPSTREAM_INFO", upstream_info)
     monkeypatch.setattr(daemon, "_load_exclude_services", lambda: set())
 
@@ -95,42 +127,28 @@ def test_update_upstreams_writes_defaults_and_per_domain(
         ),
     )
 
-    st = State(
-        schema_version=2,
-        enabled=False,
-        resume_at_epoch=None,
-        blocklist_source=None,
-        dns_backup={},
-        managed_services=[],
-    )
+    st = _mk_state()
 
     changed = daemon._update_upstreams(st)
     assert changed is True
 
-    text = upstream_conf.read_text(encoding="utf-8")
-    assert "server=1.1.1.1\n" in text
-    assert "server=/corp.example/10.0.0.1\n" in text
-    assert "127.0.0.1" not in text
+    lines = set(upstream_conf.read_text(encoding="utf-8").splitlines())
+    assert "server=1.1.1.1" in lines
+    assert "server=/corp.example/10.0.0.1" in lines
+    assert not any("127.0.0.1" in line for line in lines)
 
     assert (upstream_conf.stat().st_mode & 0o777) == 0o644
 
 
 def test_apply_state_enables_blocking_and_persists_state(
-    tmp_path, monkeypatch: pytest.MonkeyPatch
+    monkeypatch: pytest.MonkeyPatch,
+    daemon_paths: tuple[Path, Path],
+    fixed_clock: float,
+    stubbed_daemon: list[tuple[list[str], float | None]],
 ):
-    state_file = tmp_path / "state.json"
-    upstream_conf = tmp_path / "upstream.conf"
+    run_calls = stubbed_daemon
+    state_file, _upstream_conf = daemon_paths
 
-    monkeypatch.setattr(daemon, "SYSTEM_STATE_FILE", state_file)
-    monkeypatch.setattr(daemon, "VAR_DB_UPSTREAM_CONF", upstream_conf)
-
-    monkeypatch.setattr(daemon.time, "time", lambda: 1000.0)
-
-    monkeypatch.setattr(
-        daemon,
-        "compute_managed_services",
-        lambda exclude=None: [_ServiceInfo("Wi-Fi", "en0")],
-    )
     dns_by_service = {"Wi-Fi": ["8.8.8.8"]}
 
     def _get_dns(service: str):
@@ -149,27 +167,9 @@ def test_apply_state_enables_blocking_and_persists_state(
 
     monkeypatch.setattr(daemon, "set_dns_servers", _set_dns)
 
-    monkeypatch.setattr(daemon, "_update_upstreams", lambda _state: False)
-    monkeypatch.setattr(daemon, "_hup_dnsmasq", lambda: True)
-
-    run_calls: list[tuple[list[str], float | None]] = []
-
-    def _run(cmd: list[str], *, timeout: float | None = 10.0) -> RunResult:
-        run_calls.append((cmd, timeout))
-        return RunResult(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr(daemon, "run", _run)
-
     daemon.save_state_atomic(
         state_file,
-        State(
-            schema_version=2,
-            enabled=True,
-            resume_at_epoch=None,
-            blocklist_source=None,
-            dns_backup={},
-            managed_services=[],
-        ),
+        _mk_state(enabled=True, resume_at_epoch=None),
     )
 
     ok, issues = daemon._apply_state()
@@ -187,20 +187,50 @@ def test_apply_state_enables_blocking_and_persists_state(
     assert st2.managed_services == ["Wi-Fi"]
     assert "Wi-Fi" in st2.dns_backup
 
+    saves: list[State] = []
+    monkeypatch.setattr(daemon, "save_state_atomic", lambda _p, st: saves.append(st))
 
-def test_apply_state_paused_restores_dns(tmp_path, monkeypatch: pytest.MonkeyPatch):
-    state_file = tmp_path / "state.json"
-    upstream_conf = tmp_path / "upstream.conf"
+    ok, issues = daemon._apply_state()
+    assert ok is True
+    assert saves == []
 
-    monkeypatch.setattr(daemon, "SYSTEM_STATE_FILE", state_file)
-    monkeypatch.setattr(daemon, "VAR_DB_UPSTREAM_CONF", upstream_conf)
-    monkeypatch.setattr(daemon.time, "time", lambda: 1000.0)
 
-    monkeypatch.setattr(
-        daemon,
-        "compute_managed_services",
-        lambda exclude=None: [_ServiceInfo("Wi-Fi", "en0")],
-    )
+def test_apply_state_rewrites_legacy_state_file(
+    monkeypatch: pytest.MonkeyPatch,
+    daemon_paths: tuple[Path, Path],
+    fixed_clock: float,
+    stubbed_daemon: list[tuple[list[str], float | None]],
+):
+    state_file, _upstream_conf = daemon_paths
+
+    monkeypatch.setattr(daemon, "get_dns_servers", lambda _svc: ["127.0.0.1"])
+    monkeypatch.setattr(daemon, "get_search_domains", lambda _svc: None)
+    monkeypatch.setattr(daemon, "read_dhcp_nameservers", lambda _dev: [])
+    monkeypatch.setattr(daemon, "set_dns_servers", lambda _svc, _servers: True)
+
+    daemon.save_state_atomic(state_file, _mk_state(enabled=True))
+    ok, _issues = daemon._apply_state()
+    assert ok is True
+    current = state_file.read_bytes()
+
+    # Same state in the pre-epoch layout: no resume_at_epoch key, compact JSON.
+    legacy = json.loads(current)
+    del legacy["resume_at_epoch"]
+    state_file.write_text(json.dumps(legacy), encoding="utf-8")
+
+    ok, _issues = daemon._apply_state()
+    assert ok is True
+    assert state_file.read_bytes() == current
+
+
+def test_apply_state_paused_restores_dns(
+    monkeypatch: pytest.MonkeyPatch,
+    daemon_paths: tuple[Path, Path],
+    fixed_clock: float,
+    stubbed_daemon: list[tuple[list[str], float | None]],
+):
+    run_calls = stubbed_daemon
+    state_file, _upstream_conf = daemon_paths
 
     dns_by_service = {"Wi-Fi": ["127.0.0.1"]}
 
@@ -222,24 +252,11 @@ def test_apply_state_paused_restores_dns(tmp_path, monkeypatch: pytest.MonkeyPat
 
     monkeypatch.setattr(daemon, "set_dns_servers", _set_dns)
     monkeypatch.setattr(daemon, "set_search_domains", _set_search)
-    monkeypatch.setattr(daemon, "_update_upstreams", lambda _state: False)
-    monkeypatch.setattr(daemon, "_hup_dnsmasq", lambda: True)
-
-    run_calls: list[tuple[list[str], float | None]] = []
-
-    def _run(cmd: list[str], *, timeout: float | None = 10.0) -> RunResult:
-        run_calls.append((cmd, timeout))
-        return RunResult(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr(daemon, "run", _run)
-
     daemon.save_state_atomic(
         state_file,
-        State(
-            schema_version=2,
+        _mk_state(
             enabled=True,
             resume_at_epoch=2000,
-            blocklist_source=None,
             dns_backup={
                 "Wi-Fi": {"dns": ["9.9.9.9"], "search": ["corp"], "dhcp": None}
             },
@@ -271,26 +288,8 @@ class _FakeClock:
         self.now += seconds
 
 
-def _mk_state(*, enabled: bool, resume_at_epoch: int | None) -> State:
-    return State(
-        schema_version=2,
-        enabled=enabled,
-        resume_at_epoch=resume_at_epoch,
-        blocklist_source=None,
-        dns_backup={},
-        managed_services=[],
-    )
-
-
-def test_should_wait_for_network_before_apply(monkeypatch: pytest.MonkeyPatch):
-    monkeypatch.setattr(daemon.time, "time", lambda: 1000.0)
-
-    assert (
-        daemon._should_wait_for_network_before_apply(
-            _mk_state(enabled=False, resume_at_epoch=None)
-        )
-        is False
-    )
+def test_should_wait_for_network_before_apply(fixed_clock: float):
+    assert daemon._should_wait_for_network_before_apply(_mk_state()) is False
     assert (
         daemon._should_wait_for_network_before_apply(
             _mk_state(enabled=True, resume_at_epoch=None)
@@ -388,14 +387,7 @@ def test_run_daemon_exits_after_consecutive_failures(
 
     monkeypatch.setattr(daemon.signal, "signal", lambda *_a, **_k: None)
 
-    st = State(
-        schema_version=2,
-        enabled=False,
-        resume_at_epoch=None,
-        blocklist_source=None,
-        dns_backup={},
-        managed_services=[],
-    )
+    st = _mk_state()
     monkeypatch.setattr(daemon, "load_state", lambda _p: st)
 
     apply_calls = {"count": 0}
@@ -43,3 +43,19 @@ def test_run_timeout_decodes_invalid_utf8_bytes(
     assert "\ufffd" in r.stdout
     assert "\ufffd" in r.stderr
     assert "command timed out after 1.0s" in r.stderr
+
+
+def test_run_spawns_without_closing_fds(monkeypatch: pytest.MonkeyPatch) -> None:
+    captured: dict[str, object] = {}
+    real_run = subprocess.run
+
+    def _spy(cmd: list[str], **kwargs: object):
+        captured.update(kwargs)
+        return real_run(cmd, **kwargs)
+
+    monkeypatch.setattr(mbexec.subprocess, "run", _spy)
+
+    r = mbexec.run(["/bin/cat"], input="hello\n")
+    assert r.returncode == 0
+    assert r.stdout == "hello\n"
+    assert captured["close_fds"] is False
@@ -62,3 +62,65 @@ def test_atomic_write_text_cleans_up_temp_on_replace_failure(
         if p.name.startswith(f".{target.name}.") and p.name.endswith(".tmp")
     ]
     assert leftovers == []
+
+
+def test_existing_paths_filters_missing_and_keeps_order(tmp_path) -> None:
+    a = tmp_path / "a"
+    b = tmp_path / "b"
+    a.write_text("", encoding="utf-8")
+    b.write_text("", encoding="utf-8")
+
+    paths = [b, tmp_path / "missing", a, tmp_path / "no-dir" / "x"]
+    assert mbfs.existing_paths(paths) == [b, a]
+
+
+def test_ensure_dir_creates_parents_and_tolerates_existing(tmp_path) -> None:
+    target = tmp_path / "a" / "b"
+
+    mbfs.ensure_dir(target, mode=0o750)
+    mbfs.ensure_dir(target, mode=0o755)
+
+    assert target.is_dir()
+    assert target.stat().st_mode & 0o777 == 0o755
+
+    blocker = tmp_path / "file"
+    blocker.write_text("x", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        mbfs.ensure_dir(blocker)
+
+
+def test_count_lines_matches_splitlines_and_tracks_changes(tmp_path) -> None:
+    p = tmp_path / "blocklist.conf"
+    p.write_bytes(b"a\nb\nc\n")
+    assert mbfs.count_lines(p) == 3
+
+    p.write_bytes(b"a\nb\nc\nd")
+    assert mbfs.count_lines(p) == 4
+
+    p.write_bytes(b"")
+    assert mbfs.count_lines(p) == 0
+
+
+def test_atomic_write_bytes_fsyncs_before_replace(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    events: list[str] = []
+    original_fsync = mbfs.os.fsync
+    original_replace = mbfs.os.replace
+
+    def _fsync(fd: int):
+        events.append("fsync")
+        return original_fsync(fd)
+
+    def _replace(src: object, dst: object):
+        events.append("replace")
+        return original_replace(src, dst)
+
+    monkeypatch.setattr(mbfs.os, "fsync", _fsync)
+    monkeypatch.setattr(mbfs.os, "replace", _replace)
+
+    target = tmp_path / "state.json"
+    mbfs.atomic_write_bytes(target, b"{}\n")
+
+    assert events == ["fsync", "replace"]
+    assert target.read_bytes() == b"{}\n"
@@ -1,11 +1,14 @@
 import errno
+import plistlib
 from dataclasses import dataclass
 from pathlib import Path
 
 import pytest
 
 import macblock.install as install
+import macblock.launchd as launchd
 from macblock.errors import MacblockError
+from macblock.exec import RunResult
 
 
 class _DummySpinner:
@@ -142,7 +145,7 @@ def test_do_uninstall_force_continues_when_unlink_fails(
     monkeypatch.setattr(install, "_restore_dns_from_state", lambda _st: None)
     monkeypatch.setattr(install, "_remove_any_macblock_resolvers", lambda: None)
     monkeypatch.setattr(install, "bootout_system", lambda *_a, **_k: None)
-    monkeypatch.setattr(install, "service_exists", lambda _label: False)
+    monkeypatch.setattr(install, "service_loaded", lambda _label: False)
     monkeypatch.setattr(install, "delete_system_user", lambda _user: None)
     monkeypatch.setattr(install, "result_success", lambda _msg: None)
 
@@ -221,7 +224,7 @@ def test_do_uninstall_non_force_raises_on_unlink_failure(
     monkeypatch.setattr(install, "_restore_dns_from_state", lambda _st: None)
     monkeypatch.setattr(install, "_remove_any_macblock_resolvers", lambda: None)
     monkeypatch.setattr(install, "bootout_system", lambda *_a, **_k: None)
-    monkeypatch.setattr(install, "service_exists", lambda _label: False)
+    monkeypatch.setattr(install, "service_loaded", lambda _label: False)
     monkeypatch.setattr(install, "result_success", lambda _msg: None)
 
     st = install.State(
@@ -294,7 +297,7 @@ def test_do_uninstall_force_reports_dir_leftovers_when_rmdir_fails(
     monkeypatch.setattr(install, "_restore_dns_from_state", lambda _st: None)
     monkeypatch.setattr(install, "_remove_any_macblock_resolvers", lambda: None)
     monkeypatch.setattr(install, "bootout_system", lambda *_a, **_k: None)
-    monkeypatch.setattr(install, "service_exists", lambda _label: False)
+    monkeypatch.setattr(install, "service_loaded", lambda _label: False)
     monkeypatch.setattr(install, "delete_system_user", lambda _user: None)
     monkeypatch.setattr(install, "result_success", lambda _msg: None)
 
@@ -365,7 +368,7 @@ def test_do_uninstall_non_force_raises_on_rmdir_failure(
     monkeypatch.setattr(install, "_restore_dns_from_state", lambda _st: None)
     monkeypatch.setattr(install, "_remove_any_macblock_resolvers", lambda: None)
     monkeypatch.setattr(install, "bootout_system", lambda *_a, **_k: None)
-    monkeypatch.setattr(install, "service_exists", lambda _label: False)
+    monkeypatch.setattr(install, "service_loaded", lambda _label: False)
     monkeypatch.setattr(install, "result_success", lambda _msg: None)
 
     st = install.State(
@@ -421,3 +424,221 @@ def test_do_uninstall_non_force_raises_on_rmdir_failure(
 
     with pytest.raises(MacblockError, match=r"failed to remove"):
         install.do_uninstall(force=False)
+
+
+def test_do_uninstall_non_force_raises_when_job_stays_loaded(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    monkeypatch.setattr(install, "Spinner", _DummySpinner)
+    monkeypatch.setattr(install, "_restore_dns_from_state", lambda _st: None)
+    monkeypatch.setattr(install, "_remove_any_macblock_resolvers", lambda: None)
+    monkeypatch.setattr(install, "delete_system_user", lambda _user: None)
+    monkeypatch.setattr(install, "result_success", lambda _msg: None)
+
+    booted_out: list[Path] = []
+    monkeypatch.setattr(
+        install, "bootout_system", lambda plist, **_k: booted_out.append(plist)
+    )
+
+    daemon_label = f"{install.APP_LABEL}.daemon"
+    monkeypatch.setattr(install, "service_loaded", lambda label: label == daemon_label)
+
+    st = install.State(
+        schema_version=2,
+        enabled=False,
+        resume_at_epoch=None,
+        blocklist_source=None,
+        dns_backup={},
+        managed_services=[],
+    )
+    monkeypatch.setattr(install, "load_state", lambda _p: st)
+
+    launchd_dir = tmp_path / "launchd"
+    launchd_dir.mkdir()
+    daemon_plist = launchd_dir / "daemon.plist"
+    daemon_plist.write_text("test\n", encoding="utf-8")
+
+    monkeypatch.setattr(install, "LAUNCHD_DIR", launchd_dir)
+    monkeypatch.setattr(install, "LAUNCHD_DNSMASQ_PLIST", launchd_dir / "dnsmasq.plist")
+    monkeypatch.setattr(install, "LAUNCHD_DAEMON_PLIST", daemon_plist)
+    monkeypatch.setattr(
+        install, "LAUNCHD_UPSTREAMS_PLIST", launchd_dir / "upstreams.plist"
+    )
+    monkeypatch.setattr(install, "LAUNCHD_STATE_PLIST", launchd_dir / "state.plist")
+
+    monkeypatch.setattr(install, "SYSTEM_SUPPORT_DIR", tmp_path / "support")
+    monkeypatch.setattr(install, "SYSTEM_CONFIG_DIR", tmp_path / "config")
+    monkeypatch.setattr(install, "SYSTEM_LOG_DIR", tmp_path / "logs")
+
+    monkeypatch.setattr(install, "VAR_DB_DIR", tmp_path / "var-db")
+    monkeypatch.setattr(install, "VAR_DB_DNSMASQ_DIR", tmp_path / "var-db-dnsmasq")
+    monkeypatch.setattr(install, "VAR_DB_UPSTREAM_CONF", tmp_path / "upstream.conf")
+    monkeypatch.setattr(install, "VAR_DB_DNSMASQ_PID", tmp_path / "dnsmasq.pid")
+    monkeypatch.setattr(install, "VAR_DB_DAEMON_PID", tmp_path / "daemon.pid")
+    monkeypatch.setattr(install, "VAR_DB_DAEMON_LAST_APPLY", tmp_path / "daemon.last")
+
+    monkeypatch.setattr(install, "SYSTEM_DNSMASQ_CONF", tmp_path / "dnsmasq.conf")
+    monkeypatch.setattr(
+        install, "SYSTEM_RAW_BLOCKLIST_FILE", tmp_path / "blocklist.raw"
+    )
+    monkeypatch.setattr(install, "SYSTEM_BLOCKLIST_FILE", tmp_path / "blocklist.conf")
+    monkeypatch.setattr(install, "SYSTEM_WHITELIST_FILE", tmp_path / "whitelist.txt")
+    monkeypatch.setattr(install, "SYSTEM_BLACKLIST_FILE", tmp_path / "blacklist.txt")
+    monkeypatch.setattr(install, "SYSTEM_STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr(install, "SYSTEM_VERSION_FILE", tmp_path / "version")
+    monkeypatch.setattr(
+        install, "SYSTEM_DNS_EXCLUDE_SERVICES_FILE", tmp_path / "exclude"
+    )
+    monkeypatch.setattr(
+        install, "SYSTEM_UPSTREAM_FALLBACKS_FILE", tmp_path / "fallbacks"
+    )
+
+    with pytest.raises(MacblockError, match=f"launchd {daemon_label}"):
+        install.do_uninstall(force=False)
+
+    assert booted_out == [daemon_plist]
+    assert not daemon_plist.exists()
+
+
+def test_tail_log_returns_last_lines(tmp_path: Path):
+    log = tmp_path / "dnsmasq.err.log"
+    log.write_text("".join(f"line {i}\n" for i in range(5000)), encoding="utf-8")
+
+    assert install._tail_log(log, 3) == "line 4997\nline 4998\nline 4999"
+    assert install._tail_log(tmp_path / "missing.log") == ""
+
+
+def test_render_plists_return_bytes():
+    rendered = install._render_dnsmasq_plist("/opt/homebrew/sbin/dnsmasq")
+    assert isinstance(rendered, bytes)
+
+    dnsmasq = plistlib.loads(rendered)
+    assert dnsmasq["Label"] == f"{install.APP_LABEL}.dnsmasq"
+    assert dnsmasq["ProgramArguments"][0] == "/opt/homebrew/sbin/dnsmasq"
+    assert dnsmasq["KeepAlive"] is True
+
+    daemon = plistlib.loads(install._render_daemon_plist("/opt/homebrew/bin/macblock"))
+    assert daemon["ProgramArguments"] == ["/opt/homebrew/bin/macblock", "daemon"]
+    assert daemon["WorkingDirectory"] == "/var/empty"
+
+
+def test_wait_for_daemon_ready_checks_pid_without_subprocess(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    pid_file = tmp_path / "daemon.pid"
+    pid_file.write_text("4242\n", encoding="utf-8")
+    monkeypatch.setattr(install, "VAR_DB_DAEMON_PID", pid_file)
+
+    def _no_run(_cmd):
+        raise AssertionError("run() should not be called")
+
+    probed: list[int] = []
+
+    def _process_running(pid: int) -> bool:
+        probed.append(pid)
+        return True
+
+    monkeypatch.setattr(install, "run", _no_run)
+    monkeypatch.setattr(install, "process_running", _process_running)
+
+    assert install._wait_for_daemon_ready(timeout=1.0) is True
+    assert probed == [4242]
+
+
+def test_find_macblock_bin_prefers_interpreter_sibling_over_path_scan(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    venv_bin = tmp_path / "bin"
+    venv_bin.mkdir()
+    (venv_bin / "macblock").write_text("", encoding="utf-8")
+
+    def _which(_cmd: str):
+        raise AssertionError("shutil.which should not be called")
+
+    monkeypatch.delenv("MACBLOCK_BIN", raising=False)
+    monkeypatch.setattr(install.sys, "executable", str(venv_bin / "python"))
+    monkeypatch.setattr(install.shutil, "which", _which)
+
+    assert install._find_macblock_bin() == str(venv_bin / "macblock")
+
+
+def test_find_macblock_bin_prefers_homebrew_prefix_over_interpreter_sibling(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    cellar_bin = "/opt/homebrew/Cellar/macblock/1.0/libexec/bin"
+    existing = {"/opt/homebrew/bin/macblock", f"{cellar_bin}/macblock"}
+
+    monkeypatch.delenv("MACBLOCK_BIN", raising=False)
+    monkeypatch.setattr(install.sys, "executable", f"{cellar_bin}/python")
+    monkeypatch.setattr(install.os.path, "isfile", lambda p: p in existing)
+
+    assert install._find_macblock_bin() == "/opt/homebrew/bin/macblock"
+
+
+def test_detect_existing_install_lists_present_paths(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    launchd_dir = tmp_path / "launchd"
+    launchd_dir.mkdir()
+    support_dir = tmp_path / "support"
+    support_dir.mkdir()
+    (support_dir / "state.json").write_text("{}", encoding="utf-8")
+    (launchd_dir / "daemon.plist").write_text("", encoding="utf-8")
+
+    monkeypatch.setattr(install, "LAUNCHD_DIR", launchd_dir)
+    monkeypatch.setattr(install, "SYSTEM_SUPPORT_DIR", support_dir)
+    monkeypatch.setattr(install, "SYSTEM_DNSMASQ_CONF", support_dir / "etc" / "x")
+    monkeypatch.setattr(install, "SYSTEM_STATE_FILE", support_dir / "state.json")
+    monkeypatch.setattr(install, "LAUNCHD_DNSMASQ_PLIST", launchd_dir / "dns.plist")
+    monkeypatch.setattr(install, "LAUNCHD_DAEMON_PLIST", launchd_dir / "daemon.plist")
+    monkeypatch.setattr(install, "LAUNCHD_UPSTREAMS_PLIST", launchd_dir / "up.plist")
+    monkeypatch.setattr(install, "LAUNCHD_STATE_PLIST", launchd_dir / "state.plist")
+
+    assert install._detect_existing_install() == [
+        str(support_dir),
+        str(support_dir / "state.json"),
+        str(launchd_dir / "daemon.plist"),
+    ]
+
+
+def test_create_if_absent_writes_once(tmp_path: Path):
+    target = tmp_path / "dns.exclude_services"
+
+    assert install._create_if_absent(target, "# header\n", mode=0o600) is True
+    assert target.read_text(encoding="utf-8") == "# header\n"
+    assert (target.stat().st_mode & 0o777) == 0o600
+
+    target.write_text("Wi-Fi\n", encoding="utf-8")
+    assert install._create_if_absent(target, "# header\n") is False
+    assert target.read_text(encoding="utf-8") == "Wi-Fi\n"
+
+
+def test_create_if_absent_finishes_short_writes(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    target = tmp_path / "upstream.conf"
+    original_write = install.os.write
+    monkeypatch.setattr(
+        install.os, "write", lambda fd, data: original_write(fd, bytes(data[:3]))
+    )
+
+    assert install._create_if_absent(target, "server=1.1.1.1\n") is True
+    assert target.read_text(encoding="utf-8") == "server=1.1.1.1\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["upstream.conf"]
+
+
+def test_bootstrap_runs_launchctl_steps_separately(monkeypatch: pytest.MonkeyPatch):
+    calls: list[list[str]] = []
+
+    def _run(cmd: list[str], *, timeout: float | None = None) -> RunResult:
+        calls.append(cmd)
+        if cmd[1] == "enable":
+            return RunResult(returncode=5, stdout="", stderr="enable: I/O error")
+        return RunResult(returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(launchd, "run", _run)
+
+    with pytest.raises(MacblockError, match="enable: I/O error"):
+        install._bootstrap(Path("/tmp/x.plist"), "x")
+
+    assert [c[1] for c in calls] == ["bootstrap", "enable"]
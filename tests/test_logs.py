@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pytest
+
+import macblock.logs as logs
+from macblock.errors import MacblockError
+
+
+def test_tail_lines_returns_last_lines(tmp_path):
+    p = tmp_path / "x.log"
+    p.write_text("".join(f"line {i}\n" for i in range(10000)), encoding="utf-8")
+
+    assert logs._tail_lines(p, 3) == ["line 9997\n", "line 9998\n", "line 9999\n"]
+    assert logs._tail_lines(p, 0) == []
+
+
+def test_tail_lines_handles_short_and_unterminated_files(tmp_path):
+    p = tmp_path / "x.log"
+    p.write_text("a\nb", encoding="utf-8")
+    assert logs._tail_lines(p, 5) == ["a\n", "b"]
+    assert logs._tail_lines(p, 1) == ["b"]
+
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+    assert logs._tail_lines(empty, 5) == []
+
+
+def test_tail_lines_splits_only_on_newline(tmp_path):
+    p = tmp_path / "x.log"
+    p.write_bytes(b"a\nb\nc\nx\x0cy\x1cz\n")
+
+    assert logs._tail_lines(p, 1) == ["x\x0cy\x1cz\n"]
+    assert logs._tail_lines(p, 2) == ["c\n", "x\x0cy\x1cz\n"]
+
+
+def test_tail_lines_spans_read_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(logs, "_TAIL_CHUNK", 7)
+    p = tmp_path / "x.log"
+    p.write_text("".join(f"line {i}\n" for i in range(100)), encoding="utf-8")
+
+    assert logs._tail_lines(p, 3) == ["line 97\n", "line 98\n", "line 99\n"]
+    assert logs._tail_lines(p, 500) == [f"line {i}\n" for i in range(100)]
+
+
+def test_tail_lines_missing_file_raises(tmp_path):
+    with pytest.raises(MacblockError, match="not found"):
+        logs._tail_lines(tmp_path / "missing.log", 5)
+
+
+def test_watch_falls_back_to_polling_without_kqueue(tmp_path, monkeypatch):
+    monkeypatch.delattr(logs.select, "kqueue", raising=False)
+    p = tmp_path / "x.log"
+    p.write_text("", encoding="utf-8")
+
+    with p.open("r", encoding="utf-8") as f:
+        assert logs._watch(f) is None
+
+
+@pytest.mark.skipif(not hasattr(logs.select, "kqueue"), reason="requires kqueue")
+def test_wait_for_change_reports_rename(tmp_path):
+    p = tmp_path / "x.log"
+    p.write_text("", encoding="utf-8")
+
+    with p.open("r", encoding="utf-8") as f:
+        kq = logs._watch(f)
+        try:
+            p.rename(tmp_path / "x.log.0")
+            assert logs._wait_for_change(kq) is True
+        finally:
+            kq.close()
+
+
+def test_colorize_line_prefers_error_over_warning_and_success():
+    assert logs._colorize_line("Service STARTED with warning\n").startswith(
+        logs.Colors.YELLOW
+    )
+    assert logs._colorize_line("ready, but Fatal error\n").startswith(logs.Colors.RED)
+    assert logs._colorize_line("all good\n") == "all good\n"
+
+
+def test_show_logs_prints_tail_uncolored_when_not_a_tty(tmp_path, monkeypatch, capsys):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    (log_dir / "daemon.err.log").write_text("one\nerror two\n", encoding="utf-8")
+    monkeypatch.setattr(logs, "SYSTEM_LOG_DIR", log_dir)
+
+    assert logs.show_logs(component="daemon", lines=10, follow=False) == 0
+    assert capsys.readouterr().out == "one\nerror two\n"
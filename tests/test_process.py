@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+import macblock.process as process
+
+
+def _dead_pid() -> int:
+    p = subprocess.Popen([sys.executable, "-c", "pass"])
+    p.wait()
+    return p.pid
+
+
+def test_process_running_self_and_dead():
+    assert process.process_running(1) is False
+    assert process.process_running(process.os.getpid()) is True
+    assert process.process_running(_dead_pid()) is False
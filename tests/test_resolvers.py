@@ -2,9 +2,12 @@ import pytest
 
 import macblock.daemon as daemon
 from macblock.resolvers import (
+    Resolvers,
     ensure_fallback_upstreams_file,
     parse_fallback_upstreams,
     parse_upstream_conf,
+    read_upstream_conf,
+    render_dnsmasq_upstreams,
 )
 from macblock.state import State
 
@@ -32,6 +35,27 @@ server=8.8.8.8
     assert info.per_domain_rule_count == 2
 
 
+def test_read_upstream_conf_matches_parse(tmp_path):
+    text = "server=1.1.1.1\nserver=/corp.example/10.0.0.1\nserver=1.1.1.1\n"
+    path = tmp_path / "upstream.conf"
+    path.write_text(text, encoding="utf-8")
+
+    assert read_upstream_conf(path) == parse_upstream_conf(text)
+
+
+def test_render_dnsmasq_upstreams_defaults_then_sorted_domains():
+    resolvers = Resolvers(
+        defaults=["1.1.1.1", "8.8.8.8"],
+        per_domain={"zeta.example": ["10.0.0.9"], "corp.example": ["10.0.0.1"]},
+    )
+    assert render_dnsmasq_upstreams(resolvers) == (
+        "server=1.1.1.1\n"
+        "server=8.8.8.8\n"
+        "server=/corp.example/10.0.0.1\n"
+        "server=/zeta.example/10.0.0.9\n"
+    )
+
+
 def test_collect_upstream_defaults_uses_configured_fallbacks(
     tmp_path, monkeypatch: pytest.MonkeyPatch
 ):
@@ -1,45 +1,57 @@
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
 
 from macblock.errors import MacblockError
-from macblock.state import State, load_state, save_state_atomic
-
-
-def test_save_state_atomic_pins_mode(tmp_path) -> None:
-    path = tmp_path / "state.json"
-    save_state_atomic(
-        path,
-        State(
-            schema_version=2,
-            enabled=False,
-            resume_at_epoch=None,
-            blocklist_source=None,
-            dns_backup={},
-            managed_services=[],
+from macblock.state import (
+    State,
+    _iso_to_epoch_seconds,
+    _iso_to_epoch_seconds_fast,
+    load_state,
+    replace_state,
+    save_state_atomic,
+)
+
+
+@pytest.mark.parametrize(
+    ("state", "expected"),
+    [
+        (
+            State(
+                schema_version=2,
+                enabled=False,
+                resume_at_epoch=None,
+                blocklist_source=None,
+                dns_backup={},
+                managed_services=[],
+            ),
+            ['"enabled": false', '"resume_at_epoch": null'],
         ),
-    )
-
-    assert (path.stat().st_mode & 0o777) == 0o644
-
-
-def test_save_state_atomic_writes_json(tmp_path) -> None:
-    path = tmp_path / "state.json"
-    save_state_atomic(
-        path,
-        State(
-            schema_version=2,
-            enabled=True,
-            resume_at_epoch=123,
-            blocklist_source="src",
-            dns_backup={},
-            managed_services=["Wi-Fi"],
+        (
+            State(
+                schema_version=2,
+                enabled=True,
+                resume_at_epoch=123,
+                blocklist_source="src",
+                dns_backup={},
+                managed_services=["Wi-Fi"],
+            ),
+            ['"enabled": true', '"resume_at_epoch": 123'],
         ),
-    )
+    ],
+    ids=["defaults", "populated"],
+)
+def test_save_state_atomic_writes_json_with_pinned_mode(
+    tmp_path, state: State, expected: list[str]
+) -> None:
+    path = tmp_path / "state.json"
+    save_state_atomic(path, state)
 
+    assert (path.stat().st_mode & 0o777) == 0o644
     text = path.read_text(encoding="utf-8")
-    assert '"enabled": true' in text
-    assert '"resume_at_epoch": 123' in text
+    for fragment in expected:
+        assert fragment in text
     assert text.endswith("\n")
 
 
@@ -127,3 +139,55 @@ def test_load_state_raises_on_read_unicode_decode_error(
         match=r"failed to read state file: .*state\.json.*delete it to reset to defaults",
     ):
         load_state(path)
+
+
+def test_iso_to_epoch_seconds_fast_path_matches_fromisoformat():
+    for value in [
+        "2024-02-29T23:59:59+00:00",
+        "2024-02-29T23:59:59Z",
+        "2024-02-29 23:59:59",
+        "2024-03-01T01:30:00+05:30",
+        "2024-03-01T01:30:00-08:00",
+        "2024-03-01T01:30:00.250000+00:00",
+    ]:
+        norm = value[:-1] + "+00:00" if value.endswith("Z") else value
+        dt = datetime.fromisoformat(norm)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        assert _iso_to_epoch_seconds(value) == int(dt.timestamp())
+
+    assert _iso_to_epoch_seconds("not a date") is None
+    assert _iso_to_epoch_seconds("2024-13-01T00:00:00") is None
+    assert _iso_to_epoch_seconds("2023-02-29T00:00:00") is None
+
+
+def test_iso_to_epoch_seconds_fast_rejects_malformed_fields():
+    for value in [
+        "2024-+1-01T00:00:00",
+        "2024-01-01T 1:00:00",
+        "+024-01-01T00:00:00",
+        "2024-01-01T00:00:00+0 :00",
+        "２０２４-01-01T00:00:00",
+        "2024-01-01T00:00:00+24:00",
+        "2024-01-01T00:00:00+23:60",
+        "2024-01-01T00:00:00+99:99",
+    ]:
+        assert _iso_to_epoch_seconds_fast(value) is None
+        assert _iso_to_epoch_seconds(value) is None
+
+
+def test_load_state_reloads_after_file_is_replaced(tmp_path) -> None:
+    path = tmp_path / "state.json"
+    base = State(
+        schema_version=2,
+        enabled=False,
+        resume_at_epoch=None,
+        blocklist_source=None,
+        dns_backup={},
+        managed_services=[],
+    )
+    save_state_atomic(path, base)
+    assert load_state(path) is load_state(path)
+
+    save_state_atomic(path, replace_state(base, enabled=True))
+    assert load_state(path).enabled is True
@@ -3,6 +3,7 @@ import pytest
 import macblock.status as status
 from macblock.errors import MacblockError
 from macblock.exec import RunResult
+from macblock.state import State
 
 
 def test_show_status_reports_corrupt_state_and_returns_1(
@@ -37,3 +38,79 @@ def test_show_status_reports_corrupt_state_and_returns_1(
     assert "state.json" in out
     assert "state file is corrupt" in out
     assert "Services" in out
+
+
+def test_unmanaged_dnsmasq_check_prefers_process_table(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(status, "find_process_by_name", lambda _name: 4242)
+    monkeypatch.setattr(status, "run", lambda _cmd: pytest.fail("pgrep spawned"))
+    assert status._unmanaged_dnsmasq_running() is True
+
+
+def test_unmanaged_dnsmasq_check_falls_back_to_pgrep(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def _unavailable(_name):
+        raise OSError("libproc unavailable")
+
+    calls: list[list[str]] = []
+
+    def _run(cmd):
+        calls.append(cmd)
+        return RunResult(0, "123\n", "")
+
+    monkeypatch.setattr(status, "find_process_by_name", _unavailable)
+    monkeypatch.setattr(status, "run", _run)
+    assert status._unmanaged_dnsmasq_running() is True
+    assert calls == [["/usr/bin/pgrep", "-x", "dnsmasq"]]
+
+
+def test_show_status_formats_resume_time_in_local_time(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    for name in [
+        "SYSTEM_BLOCKLIST_FILE",
+        "VAR_DB_DNSMASQ_PID",
+        "VAR_DB_DAEMON_PID",
+        "VAR_DB_DAEMON_LAST_APPLY",
+        "VAR_DB_UPSTREAM_CONF",
+        "VAR_DB_UPSTREAM_INFO",
+        "SYSTEM_UPSTREAM_FALLBACKS_FILE",
+        "LAUNCHD_DIR",
+        "LAUNCHD_DNSMASQ_PLIST",
+    ]:
+        monkeypatch.setattr(status, name, tmp_path / name.lower())
+
+    resume_at = int(status.time.time()) + 600
+    st = State(
+        schema_version=2,
+        enabled=True,
+        resume_at_epoch=resume_at,
+        blocklist_source=None,
+        dns_backup={},
+        managed_services=[],
+    )
+    monkeypatch.setattr(status, "load_state", lambda _path: st)
+    monkeypatch.setattr(status, "_unmanaged_dnsmasq_running", lambda: False)
+
+    assert status.show_status() == 0
+
+    expected = status.time.strftime("%H:%M:%S", status.time.localtime(resume_at))
+    assert expected in capsys.readouterr().out
+
+
+def test_read_pid_handles_missing_invalid_and_reserved(tmp_path):
+    pid_file = tmp_path / "x.pid"
+    assert status._read_pid(pid_file) is None
+
+    pid_file.write_bytes(b"garbage\n")
+    assert status._read_pid(pid_file) is None
+
+    pid_file.write_bytes(b"1\n")
+    assert status._read_pid(pid_file) is None
+
+    pid_file.write_bytes(b" 4242\n")
+    assert status._read_pid(pid_file) == 4242
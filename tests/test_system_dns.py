@@ -1,6 +1,7 @@
 import pytest
 
 import macblock.system_dns as system_dns
+from macblock.exec import RunResult
 
 
 def test_parse_listnetworkserviceorder_maps_devices():
@@ -13,9 +14,13 @@ def test_parse_listnetworkserviceorder_maps_devices():
 
 (3) Tailscale
 (Hardware Port: io.tailscale.ipn.macsys, Device: )
+
+(*) Bluetooth PAN
+(Hardware Port: Bluetooth PAN, Device: en9)
 """
 
     mapping = system_dns._parse_networksetup_listnetworkserviceorder(text)
+    assert list(mapping) == ["Wi-Fi", "Thunderbolt Bridge", "Tailscale"]
     assert mapping["Wi-Fi"] == "en0"
     assert mapping["Thunderbolt Bridge"] == "bridge0"
     assert mapping["Tailscale"] is None
@@ -25,7 +30,7 @@ def test_compute_managed_services_uses_device_map(monkeypatch: pytest.MonkeyPatc
     monkeypatch.setattr(
         system_dns,
         "list_enabled_network_services",
-        lambda: ["Wi-Fi", "Tailscale", "Thunderbolt Bridge"],
+        lambda: pytest.fail("-listallnetworkservices should not be needed"),
     )
     monkeypatch.setattr(
         system_dns,
@@ -38,3 +43,147 @@ def test_compute_managed_services_uses_device_map(monkeypatch: pytest.MonkeyPatc
     by_name = {s.name: s.device for s in managed}
     assert by_name["Wi-Fi"] == "en0"
     assert by_name["Thunderbolt Bridge"] == "bridge0"
+
+
+_SCUTIL_LIST = """  subKey [0] = Setup:/Network/Service/AAA
+  subKey [1] = Setup:/Network/Service/BBB
+  subKey [2] = Setup:/Network/Service/CCC
+"""
+
+_SCUTIL_SHOW = """<dictionary> {
+  UserDefinedName : Wi-Fi
+}
+<dictionary> {
+  ServerAddresses : <array> {
+    0 : 127.0.0.1
+  }
+}
+<dictionary> {
+  Interface : <dictionary> {
+    UserDefinedName : Nested
+  }
+  UserDefinedName : Ethernet
+}
+  No such key
+<dictionary> {
+  UserDefinedName : USB LAN
+}
+<dictionary> {
+  SearchDomains : <array> {
+    0 : example.com
+  }
+  ServerAddresses : <array> {
+    0 : 1.1.1.1
+    1 : 8.8.8.8
+  }
+}
+"""
+
+
+def test_get_dns_servers_many_batches_through_scutil(monkeypatch: pytest.MonkeyPatch):
+    calls: list[list[str]] = []
+
+    def _run(cmd, *, input=None, **_kwargs):
+        calls.append(cmd)
+        assert cmd == ["/usr/sbin/scutil"]
+        out = _SCUTIL_LIST if input.startswith("list ") else _SCUTIL_SHOW
+        return RunResult(0, out, "")
+
+    monkeypatch.setattr(system_dns, "run", _run)
+    monkeypatch.setattr(
+        system_dns, "get_dns_servers", lambda svc: pytest.fail(f"fallback: {svc}")
+    )
+
+    result = system_dns.get_dns_servers_many(["Wi-Fi", "Ethernet", "USB LAN"])
+    assert result == {
+        "Wi-Fi": ["127.0.0.1"],
+        "Ethernet": None,
+        "USB LAN": ["1.1.1.1", "8.8.8.8"],
+    }
+    assert len(calls) == 2
+
+
+def test_get_dns_servers_many_falls_back_when_scutil_fails(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(system_dns, "run", lambda _cmd, **_kw: RunResult(1, "", ""))
+    monkeypatch.setattr(system_dns, "get_dns_servers", lambda svc: [f"{svc}-dns"])
+
+    assert system_dns.get_dns_servers_many(["a", "b", "c"]) == {
+        "a": ["a-dns"],
+        "b": ["b-dns"],
+        "c": ["c-dns"],
+    }
+
+
+def test_read_dhcp_nameservers_filters_and_dedupes(monkeypatch: pytest.MonkeyPatch):
+    out = "192.168.1.1 8.8.8.8 192.168.1.1 127.0.0.1 999.1.1.1 fe80::1 1.2.3\n"
+    monkeypatch.setattr(system_dns, "run", lambda _cmd: RunResult(0, out, ""))
+
+    assert system_dns.read_dhcp_nameservers("en0") == ["192.168.1.1", "8.8.8.8"]
+    assert system_dns.read_dhcp_nameservers("") == []
+
+
+def test_parse_listallnetworkservices_skips_header_and_disabled():
+    text = """An asterisk (*) denotes that a network service is disabled.
+Wi-Fi
+*Bluetooth PAN
+
+  Thunderbolt Bridge  
+"""
+    assert list(system_dns._parse_networksetup_listallnetworkservices(text)) == [
+        "Wi-Fi",
+        "Thunderbolt Bridge",
+    ]
+
+
+def test_get_dns_servers_reuses_reads_until_set(monkeypatch: pytest.MonkeyPatch):
+    calls: list[list[str]] = []
+
+    def _run(cmd: list[str]) -> RunResult:
+        calls.append(cmd)
+        return RunResult(0, "1.1.1.1\n", "")
+
+    monkeypatch.setattr(system_dns, "_query_cache", {})
+    monkeypatch.setattr(system_dns, "run", _run)
+
+    first = system_dns.get_dns_servers("Wi-Fi")
+    assert first == ["1.1.1.1"]
+    first.append("mutated")
+    assert system_dns.get_dns_servers("Wi-Fi") == ["1.1.1.1"]
+    assert len(calls) == 1
+
+    system_dns.set_dns_servers("Wi-Fi", ["127.0.0.1"])
+    system_dns.get_dns_servers("Wi-Fi")
+    assert [c[1] for c in calls] == [
+        "-getdnsservers",
+        "-setdnsservers",
+        "-getdnsservers",
+    ]
+
+
+def test_parse_networksetup_per_service_outputs():
+    assert system_dns._parse_getdnsservers("1.1.1.1\r\n\n 9.9.9.9\n") == [
+        "1.1.1.1",
+        "9.9.9.9",
+    ]
+    assert (
+        system_dns._parse_getdnsservers("There aren't any DNS Servers set on Wi-Fi.\n")
+        is None
+    )
+    assert system_dns._parse_getdnsservers("\n") is None
+
+    assert system_dns._parse_getsearchdomains("corp.example.\nlan\n") == [
+        "corp.example",
+        "lan",
+    ]
+    assert (
+        system_dns._parse_getsearchdomains(
+            "There aren't any Search Domains set on Wi-Fi.\n"
+        )
+        is None
+    )
+
+    info = "DHCP Configuration\nIP address: 10.0.0.2\nDevice: en0\n"
+    assert system_dns._parse_getinfo_device(info) == "en0"
+    assert system_dns._parse_getinfo_device("Device: \n") is None